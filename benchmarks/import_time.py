@@ -0,0 +1,86 @@
+"""Measure CLI startup cost and fail when it exceeds the import-time budget.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py [--budget-ms 150]
+
+Each check runs in a fresh interpreter. The script exits non-zero if
+``import dca_btc`` takes longer than the budget, if ``--help`` pulls in any
+heavy dependency, or if matplotlib is loaded before a chart is requested.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("ccxt", "pandas", "matplotlib", "numpy")
+BUDGET_MS = 150.0
+
+
+def _run(code):
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_import(module, repeat=5):
+    """Best-of-``repeat`` wall time for importing ``module`` in a fresh process, in ms"""
+    code = (
+        "import time, json, sys\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = (time.perf_counter() - t) * 1000\n"
+        f"print(json.dumps({{'ms': elapsed, 'modules': sorted({{m.split('.')[0] for m in sys.modules}})}}))"
+    )
+    runs = [_run(code) for _ in range(repeat)]
+    return min(run["ms"] for run in runs), runs[0]["modules"]
+
+
+def modules_loaded_by_help():
+    code = (
+        "import sys, json, io, contextlib\n"
+        "sys.argv = ['dca_btc.py', '--help']\n"
+        "import dca_btc\n"
+        "try:\n"
+        "    with contextlib.redirect_stdout(io.StringIO()):\n"
+        "        dca_btc.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    return _run(code)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the dca_btc.py import-time budget")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS,
+                        help="Maximum allowed time to import dca_btc")
+    args = parser.parse_args()
+
+    failures = []
+    import_ms, modules = measure_import("dca_btc")
+    print(f"import dca_btc: {import_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if import_ms > args.budget_ms:
+        failures.append(f"import dca_btc took {import_ms:.1f} ms")
+
+    heavy_at_import = [m for m in HEAVY_MODULES if m in modules]
+    heavy_at_help = [m for m in HEAVY_MODULES if m in modules_loaded_by_help()]
+    print(f"heavy modules after import: {heavy_at_import or 'none'}")
+    print(f"heavy modules after --help: {heavy_at_help or 'none'}")
+    if heavy_at_import or heavy_at_help:
+        failures.append(f"heavy modules loaded eagerly: {sorted(set(heavy_at_import + heavy_at_help))}")
+
+    _, analysis_modules = measure_import("src.multi_pair, src.portfolio_analyzer", repeat=1)
+    if "matplotlib" in analysis_modules:
+        failures.append("matplotlib is loaded by the non-plotting analysis path")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
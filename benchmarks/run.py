@@ -0,0 +1,306 @@
+"""Benchmark suite for the calculator, fetch pipeline, chart rendering and rebalancing.
+
+Run from the repository root:
+
+    python benchmarks/run.py                       # quick preset
+    python benchmarks/run.py --full                # up to 10y of minute bars / 500 pairs
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --baseline bench.json --tolerance 1.2
+
+Every case uses synthetic prices and, for fetching, a local ``ReplayExchange``,
+so no network is needed. Each case reports wall time (best of ``--repeat``),
+peak traced memory and throughput in bars per second. With ``--baseline`` the
+run is compared case by case and exits non-zero on any regression beyond
+``--tolerance``.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import BAR_MS, START_TS, synthetic_exchange, synthetic_frame, synthetic_ohlcv  # noqa: E402
+
+# name: (bars, timeframe, quick preset)
+SERIES_SIZES = {
+    "daily_1y": (365, "1d", True),
+    "daily_10y": (3650, "1d", True),
+    "hourly_1y": (8760, "1h", True),
+    "hourly_10y": (87600, "1h", False),
+    "minute_1y": (525600, "1m", False),
+    "minute_10y": (5256000, "1m", False),
+}
+PAIR_COUNTS = {1: True, 10: True, 100: True, 500: False}
+CHART_PAIR_COUNTS = {1: True, 10: True, 50: False}
+
+
+class Case:
+    def __init__(self, stage, name, bars, setup, run):
+        self.stage = stage
+        self.name = name
+        self.bars = bars
+        self.setup = setup
+        self.run = run
+
+    @property
+    def key(self):
+        return f"{self.stage}/{self.name}"
+
+
+def calculator_cases(full):
+    from src.calculator import DCACalculator
+
+    cases = []
+    for name, (bars, timeframe, quick) in SERIES_SIZES.items():
+        if not (quick or full):
+            continue
+        cases.append(Case(
+            "calculator", name, bars,
+            setup=lambda bars=bars, timeframe=timeframe: synthetic_frame(bars, timeframe),
+            run=lambda df, timeframe=timeframe: DCACalculator(df, 10.0, "1d", timeframe),
+        ))
+    return cases
+
+
+def process_cases(full):
+    from src.price_fetcher import PriceDataFetcher
+
+    fetcher = PriceDataFetcher(exchange=synthetic_exchange([], 0))
+    cases = []
+    for name, (bars, timeframe, quick) in SERIES_SIZES.items():
+        if not (quick or full):
+            continue
+        cases.append(Case(
+            "process", name, bars,
+            setup=lambda bars=bars, timeframe=timeframe: synthetic_ohlcv(bars, timeframe).tolist(),
+            run=lambda data, timeframe=timeframe: fetcher._process_ohlcv_data(data, timeframe),
+        ))
+    return cases
+
+
+def pipeline_cases(full):
+    from src.calculator import DCACalculator
+    from src.price_fetcher import PriceDataFetcher
+
+    bars = SERIES_SIZES["daily_10y"][0]
+    start = datetime.fromtimestamp(START_TS / 1000)
+    end = datetime.fromtimestamp((START_TS + (bars - 1) * BAR_MS["1d"]) / 1000)
+
+    def run(fetcher):
+        for symbol, _ in fetcher.exchange._candles:
+            price_data = fetcher.fetch_historical_data(symbol, start, end)
+            DCACalculator(price_data, 10.0, "1d")
+
+    cases = []
+    for pairs, quick in PAIR_COUNTS.items():
+        if not (quick or full):
+            continue
+        symbols = [f"SYN{i}/USDT" for i in range(pairs)]
+        cases.append(Case(
+            "pipeline", f"daily_10y_{pairs}_pairs", bars * pairs,
+            setup=lambda symbols=symbols: PriceDataFetcher(exchange=synthetic_exchange(symbols, bars)),
+            run=run,
+        ))
+    return cases
+
+
+def chart_cases(full):
+    from src.calculator import DCACalculator
+    from src.visualizer import DCAVisualizer
+
+    bars = SERIES_SIZES["daily_10y"][0]
+    start = datetime.fromtimestamp(START_TS / 1000)
+    end = datetime.fromtimestamp((START_TS + (bars - 1) * BAR_MS["1d"]) / 1000)
+
+    def setup(pairs):
+        return {
+            f"SYN{i}/USDT": {
+                "allocation": 100 / pairs,
+                "results": DCACalculator(synthetic_frame(bars, seed=i), 10.0 / pairs).results,
+            }
+            for i in range(pairs)
+        }
+
+    def run_single(all_results):
+        data = next(iter(all_results.values()))
+        DCAVisualizer(data["results"], "SYN0", start, end).plot_single_pair("bench")
+
+    def run_total(all_results):
+        data = next(iter(all_results.values()))
+        DCAVisualizer(data["results"], "PORTFOLIO", start, end).plot_total_portfolio(all_results, "bench")
+
+    cases = [Case("charts", "single_pair_daily_10y", bars, setup=lambda: setup(1), run=run_single)]
+    for pairs, quick in CHART_PAIR_COUNTS.items():
+        if not (quick or full):
+            continue
+        cases.append(Case(
+            "charts", f"total_portfolio_{pairs}_pairs", bars * pairs,
+            setup=lambda pairs=pairs: setup(pairs), run=run_total,
+        ))
+    return cases
+
+
+def rebalance_cases(full):
+    from src.calculator import DCACalculator
+    from src.rebalancing import RebalancedPortfolio
+
+    bars = 2 * SERIES_SIZES["hourly_1y"][0]
+
+    def setup(pairs):
+        return {
+            f"SYN{i}/USDT": {
+                "allocation": 100 / pairs,
+                "results": DCACalculator(synthetic_frame(bars, "1h", seed=i), 10.0 / pairs, "1d", "1h").results,
+            }
+            for i in range(pairs)
+        }
+
+    # Rules from rare to firing on every bar
+    rules = {"monthly": {"every": "1m"}, "drift_1pct": {"threshold": 0.01}, "hourly": {"every": "1h"}}
+    cases = []
+    for pairs, quick in PAIR_COUNTS.items():
+        if not (quick or full) or pairs == 1:
+            continue
+        for name, rule in rules.items():
+            cases.append(Case(
+                "rebalance", f"hourly_2y_{pairs}_pairs_{name}", bars * pairs,
+                setup=lambda pairs=pairs: setup(pairs),
+                run=lambda all_results, rule=rule: RebalancedPortfolio(all_results, **rule),
+            ))
+    return cases
+
+
+STAGES = {
+    "calculator": calculator_cases,
+    "process": process_cases,
+    "pipeline": pipeline_cases,
+    "charts": chart_cases,
+    "rebalance": rebalance_cases,
+}
+
+
+def measure(case, repeat, trace_memory):
+    payload = case.setup()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        case.run(payload)
+        timings.append(time.perf_counter() - started)
+
+    peak_bytes = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        case.run(payload)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    wall = min(timings)
+    return {
+        "stage": case.stage,
+        "bars": case.bars,
+        "wall_seconds": wall,
+        "peak_memory_bytes": peak_bytes,
+        "bars_per_second": case.bars / wall if wall > 0 else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get("cases", {}).get(key)
+        if not previous:
+            continue
+        ratio = result["wall_seconds"] / previous["wall_seconds"]
+        result["baseline_ratio"] = ratio
+        if ratio > tolerance:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def print_table(results):
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Benchmark Results", header_style="bold cyan")
+    table.add_column("Case", style="cyan")
+    table.add_column("Bars", justify="right")
+    table.add_column("Wall", justify="right")
+    table.add_column("Peak Memory", justify="right")
+    table.add_column("Bars/s", justify="right")
+    table.add_column("vs Baseline", justify="right")
+    for key, r in results.items():
+        memory = f"{r['peak_memory_bytes'] / 2**20:,.1f} MiB" if r["peak_memory_bytes"] is not None else "-"
+        ratio = r.get("baseline_ratio")
+        ratio_text = "-" if ratio is None else f"[{'red' if ratio > 1 else 'green'}]{ratio:.2f}x[/]"
+        table.add_row(
+            key, f"{r['bars']:,}", f"{r['wall_seconds'] * 1000:,.1f} ms", memory,
+            f"{r['bars_per_second']:,.0f}" if r["bars_per_second"] else "-", ratio_text,
+        )
+    Console(stderr=True).print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DCA analyzer benchmark suite")
+    parser.add_argument("--full", action="store_true",
+                        help="Include the large cases (10y minute bars, 500 pairs)")
+    parser.add_argument("--stage", choices=sorted(STAGES), action="append",
+                        help="Only run the given stage (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case, best is reported")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak-memory run")
+    parser.add_argument("--output", type=str, help="Write results as JSON to this file")
+    parser.add_argument("--baseline", type=str, help="Compare against a previously saved JSON file")
+    parser.add_argument("--tolerance", type=float, default=1.2,
+                        help="Allowed slowdown factor versus the baseline")
+    args = parser.parse_args()
+
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="dca_bench_")
+    cwd = os.getcwd()
+    # Charts are written to ./dca, keep them out of the working tree
+    os.chdir(workdir)
+    os.makedirs("dca", exist_ok=True)
+    try:
+        for stage in args.stage or list(STAGES):
+            for case in STAGES[stage](args.full):
+                results[case.key] = measure(case, args.repeat, not args.no_memory)
+    finally:
+        os.chdir(cwd)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+    print_table(results)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for key, ratio in regressions:
+        print(f"REGRESSION: {key} is {ratio:.2f}x slower than baseline", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
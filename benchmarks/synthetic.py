@@ -0,0 +1,46 @@
+"""Synthetic price series and exchanges for the benchmark suite."""
+import numpy as np
+import pandas as pd
+
+START_TS = 1577836800000  # 2020-01-01
+BAR_MS = {"1m": 60_000, "1h": 3_600_000, "1d": 86_400_000}
+
+
+def synthetic_ohlcv(n_bars, timeframe="1d", seed=0):
+    """Geometric random walk as an ``(n_bars, 6)`` float64 OHLCV array"""
+    rng = np.random.default_rng(seed)
+    bar_ms = BAR_MS[timeframe]
+    # Scale daily volatility of ~3% down to the bar size
+    sigma = 0.03 * np.sqrt(bar_ms / BAR_MS["1d"])
+    close = 100 * np.exp(np.cumsum(rng.normal(0, sigma, n_bars)))
+    open_ = np.concatenate([[100.0], close[:-1]])
+    spread = np.abs(rng.normal(0, sigma, n_bars)) * close
+    rows = np.empty((n_bars, 6))
+    rows[:, 0] = START_TS + np.arange(n_bars) * bar_ms
+    rows[:, 1] = open_
+    rows[:, 2] = np.maximum(open_, close) + spread
+    rows[:, 3] = np.minimum(open_, close) - spread
+    rows[:, 4] = close
+    rows[:, 5] = rng.uniform(1, 1000, n_bars)
+    return rows
+
+
+def synthetic_frame(n_bars, timeframe="1d", seed=0):
+    """Synthetic candles shaped like ``PriceDataFetcher`` output"""
+    rows = synthetic_ohlcv(n_bars, timeframe, seed)
+    df = pd.DataFrame(rows, columns=["Start", "Open", "High", "Low", "Close", "Volume"])
+    df["Start"] = pd.to_datetime(df["Start"].astype(np.int64), unit="ms")
+    return df
+
+
+def synthetic_exchange(symbols, n_bars, timeframe="1d", **replay_options):
+    """``ReplayExchange`` serving a different synthetic series per symbol"""
+    from src.exchange_backends import ReplayExchange
+
+    candles = {}
+    for seed, symbol in enumerate(symbols):
+        rows = synthetic_ohlcv(n_bars, timeframe, seed).tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        candles[(symbol, timeframe)] = rows
+    return ReplayExchange(exchange_id="synthetic", candles=candles, **replay_options)
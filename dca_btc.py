@@ -1,17 +1,11 @@
 import argparse
 from datetime import datetime, timedelta
-import ccxt
 import os
 from rich.console import Console
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.layout import Layout
-from rich.live import Live
-from rich.prompt import Prompt
-from rich.table import Table
-from src.multi_pair import MultiPairDCAManager
-from src.visualizer import DCAVisualizer
-from src.portfolio_analyzer import PortfolioAnalyzer
+
+# ccxt, pandas, matplotlib and the src modules are imported inside main() on
+# the paths that need them, so --help and non-plotting runs start quickly
 
 console = Console()
 
@@ -36,6 +30,62 @@ def validate_pairs(pairs_str):
     except ValueError:
         return None
 
+def build_price_sources(args):
+    """Return the candle cache and the exchange backend (``None`` for the live client)"""
+    from src.price_cache import OHLCVCache
+    from src.price_store import MemmapPriceStore
+
+    cache_class = MemmapPriceStore if args.cache_format == "memmap" else OHLCVCache
+    cache = None if args.no_cache else cache_class(args.cache_dir)
+    exchange = None
+    if args.replay:
+        from src.exchange_backends import ReplayExchange
+        exchange = ReplayExchange(
+            args.replay, args.exchange,
+            latency=args.replay_latency,
+            page_limit=args.replay_page_limit,
+            fault_rate=args.replay_fault_rate
+        )
+    elif args.record:
+        from src.exchange_backends import RecordingExchange
+        from src.price_fetcher import PriceDataFetcher
+        exchange = RecordingExchange(PriceDataFetcher(args.exchange).exchange, args.record)
+    return cache, exchange
+
+def flush_recording(exchange):
+    """Write out what a ``--record`` run captured, also when it stopped on an error"""
+    if exchange is None:
+        return
+    from src.exchange_backends import RecordingExchange
+
+    if isinstance(exchange, RecordingExchange):
+        exchange.flush()
+
+def serve(args):
+    from src.server import DCAService, make_server
+
+    cache, exchange = build_price_sources(args)
+    service = DCAService(
+        cache, offline=args.offline, max_entries=args.result_cache_size,
+        exchanges={args.exchange: exchange} if exchange is not None else None
+    )
+    server = make_server(service, args.host, args.port)
+    console.print(Panel(
+        f"[cyan]Listening on[/cyan] http://{args.host}:{args.port}\n\n"
+        "[yellow]GET[/yellow]  /dca?pairs=BTC/USDT:80,ETH/USDT:20&start=2021-01-01&daily_investment=10&buy_period=1w\n"
+        "[yellow]POST[/yellow] /dca with the same fields as JSON\n"
+        "[yellow]GET[/yellow]  /health",
+        title="🌐 DCA API Server",
+        border_style="cyan"
+    ))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[yellow]Shutting down...[/yellow]")
+    finally:
+        server.server_close()
+        flush_recording(exchange)
+
 def main():
     parser = argparse.ArgumentParser(
         description="🚀 Cryptocurrency Dollar Cost Averaging (DCA) Calculator",
@@ -52,14 +102,88 @@ def main():
                       default=["BTC/USDT:100"],
                       help="Trading pairs with allocation (e.g., BTC/USDT:80 ETH/USDT:20)")
     parser.add_argument("--buy-period", type=str, default="1d",
-                      help="Buy period (1d=daily, 1w=weekly, 2w=biweekly, 1m=monthly)")
+                      help="Buy period (30min, 4h, 1d=daily, 1w=weekly, 2w=biweekly, 1m=monthly)")
+    parser.add_argument("--strategy", type=str, default=None,
+                      help="How much each buy invests: fixed (default), value-averaging, buy-the-dip[:MULTIPLIER] "
+                           "or ma-gate[:DAYS]")
+    parser.add_argument("--compare-strategies", action="store_true",
+                      help="Also compare every built-in strategy on each pair's history")
+    parser.add_argument("--rebalance", type=str, default=None, metavar="PERIOD",
+                      help="Also simulate trading the portfolio back to its allocation every PERIOD (1w, 1m, 3m)")
+    parser.add_argument("--rebalance-threshold", type=float, default=None, metavar="PCT",
+                      help="Also rebalance whenever a weight drifts more than PCT percentage points from its target")
+    parser.add_argument("--rebalance-fee", type=float, default=0.0, metavar="PCT",
+                      help="Trading fee in percent of the rebalanced notional (default: 0)")
+    parser.add_argument("--timeframe", type=str, default="1d",
+                      help="Candle size fetched from the exchange, in ccxt notation (1m, 5m, 1h, 4h, 1d)")
     parser.add_argument("--plot-type", type=str,
-                      choices=["all", "total", "both"],
+                      choices=["all", "total", "both", "none"],
                       default="both",
                       help="Type of plot to generate")
+    parser.add_argument("--chart-dpi", type=int, default=300,
+                      help="Resolution of the saved charts")
+    parser.add_argument("--chart-format", type=str, default="png",
+                      choices=["png", "jpg", "svg", "pdf"],
+                      help="Image format of the saved charts")
+    parser.add_argument("--chart-workers", type=int, default=None,
+                      help="Number of processes rendering per-pair charts (default: CPU count)")
+    parser.add_argument("--export", type=str, default=None, choices=["npz", "parquet"],
+                      help="Also write every pair's full series and the portfolio totals (parquet needs pyarrow)")
+    parser.add_argument("--export-compression", type=str, default=None,
+                      help="Compress the export: any value deflates an npz, parquet takes a codec (zstd, snappy, gzip)")
+    parser.add_argument("--plot-rolling", action="store_true",
+                      help="Also chart 30/90/365-day rolling volatility, Sharpe ratio and drawdown per pair")
+    parser.add_argument("--profile", action="store_true",
+                      help="Print a per-stage timing breakdown at the end of the run")
+    parser.add_argument("--profile-output", type=str, metavar="FILE",
+                      help="Also write the profile to FILE (*.trace.json for a Chrome trace, else a JSON summary)")
+    parser.add_argument("--cache-dir", type=str, default="dca/cache",
+                      help="Directory for the local OHLCV cache")
+    parser.add_argument("--cache-format", type=str, default="npz", choices=["npz", "memmap"],
+                      help="Cache layout: one .npz file per pair, or memory-mapped column files for large histories")
+    parser.add_argument("--compact", action="store_true",
+                      help="Keep candles as int64 timestamps and NumPy price arrays instead of DataFrames")
+    parser.add_argument("--price-dtype", type=str, default="float64", choices=["float64", "float32"],
+                      help="Precision of the fetched prices; totals are always summed in float64")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Always download the full history instead of using the local cache")
+    parser.add_argument("--offline", action="store_true",
+                      help="Only use cached candles, never contact the exchange")
+    parser.add_argument("--record", type=str, metavar="DIR",
+                      help="Save every exchange response to DIR for later replay")
+    parser.add_argument("--replay", type=str, metavar="DIR",
+                      help="Serve candles from recordings in DIR instead of the live exchange")
+    parser.add_argument("--replay-latency", type=float, default=0.0,
+                      help="Seconds of simulated latency per replayed request")
+    parser.add_argument("--replay-page-limit", type=int, default=None,
+                      help="Maximum candles per replayed page")
+    parser.add_argument("--replay-fault-rate", type=float, default=0.0,
+                      help="Probability of an injected rate-limit or network error per replayed request")
+    parser.add_argument("--max-concurrency", type=int, default=5,
+                      help="Maximum number of pairs fetched at the same time (1 = sequential)")
+    parser.add_argument("--fetch-workers", type=int, default=4,
+                      help="Time segments of one long backfill fetched at the same time (1 = serial paging)")
+    parser.add_argument("--simulate", type=int, default=0, metavar="PATHS",
+                      help="Run a Monte Carlo simulation with PATHS synthetic price paths per pair")
+    parser.add_argument("--simulation-method", type=str, default="bootstrap", choices=["bootstrap", "gbm"],
+                      help="Build paths by block bootstrap of historical returns or as GBM")
+    parser.add_argument("--simulation-days", type=int, default=None,
+                      help="Length of each simulated path in days (default: length of the history)")
+    parser.add_argument("--serve", action="store_true",
+                      help="Run a local JSON API server instead of a one-off analysis")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                      help="Address the API server listens on")
+    parser.add_argument("--port", type=int, default=8000,
+                      help="Port the API server listens on")
+    parser.add_argument("--result-cache-size", type=int, default=256,
+                      help="Maximum number of pair results the API server keeps in memory")
 
     args = parser.parse_args()
 
+    if args.serve:
+        serve(args)
+        return
+
     # Create output directory
     os.makedirs("dca", exist_ok=True)
 
@@ -92,15 +216,51 @@ def main():
         ))
         return
 
+    if args.strategy:
+        from src.strategies import get_strategy
+        try:
+            get_strategy(args.strategy)
+        except ValueError as e:
+            console.print(Panel(
+                f"[red]{e}[/red]\n"
+                "Example: --strategy buy-the-dip:2 or --strategy ma-gate:200",
+                title="❌ Strategy Error",
+                border_style="red"
+            ))
+            return
+
+    if args.rebalance:
+        from src.calculator import parse_buy_period_seconds
+        try:
+            parse_buy_period_seconds(args.rebalance)
+        except ValueError as e:
+            console.print(Panel(f"[red]{e}[/red]", title="❌ Rebalancing Error", border_style="red"))
+            return
+
+    import ccxt
+    from src.profiling import profiler
+    if args.profile or args.profile_output:
+        profiler.enable()
+    from src.multi_pair import MultiPairDCAManager
+    from src.portfolio_analyzer import PortfolioAnalyzer
+
+    exchange = None
     try:
         # Initialize manager and run analysis
-        manager = MultiPairDCAManager(args.exchange)
+        cache, exchange = build_price_sources(args)
+        manager = MultiPairDCAManager(
+            args.exchange, cache=cache, offline=args.offline,
+            max_concurrency=args.max_concurrency, exchange=exchange,
+            fetch_workers=args.fetch_workers, compact=args.compact, price_dtype=args.price_dtype
+        )
         results = manager.calculate_multiple_pairs(
             pairs_allocation,
             args.daily_investment,
             start_date,
             end_date,
-            args.buy_period
+            args.buy_period,
+            args.timeframe,
+            args.strategy
         )
 
         # Generate timestamp for consistent file naming
@@ -110,27 +270,95 @@ def main():
         analyzer = PortfolioAnalyzer(results)
         analyzer.display_portfolio_summary(timestamp)
 
+        if args.export:
+            from src.export import export_results, parquet_available
+
+            export_format = args.export
+            if export_format == "parquet" and not parquet_available():
+                console.print("[yellow]pyarrow is not installed, exporting to .npz instead[/yellow]")
+                export_format = "npz"
+            paths = export_results(
+                results, f"dca/dca_analysis_{timestamp}", export_format,
+                compression=args.export_compression, portfolio=analyzer.portfolio
+            )
+            console.print(f"[green]Exported the full series to {', '.join(paths)}[/green]")
+
+        if args.rebalance or args.rebalance_threshold is not None:
+            from src.rebalancing import RebalancedPortfolio
+
+            rebalanced = RebalancedPortfolio(
+                results, every=args.rebalance,
+                threshold=None if args.rebalance_threshold is None else args.rebalance_threshold / 100,
+                fee=args.rebalance_fee / 100
+            )
+            rebalanced.print_summary(console, analyzer.portfolio)
+
+        if args.compare_strategies:
+            from src.price_store import PriceWindow
+            from src.strategies import STRATEGIES, compare_strategies, print_comparison
+
+            for pair, data in results.items():
+                r = data['results']
+                comparison = compare_strategies(
+                    PriceWindow(r.timestamps, {"Close": r.prices}), list(STRATEGIES),
+                    args.daily_investment * data['allocation'] / 100, args.buy_period, args.timeframe
+                )
+                print_comparison(console, comparison, f"🧭 {pair} Strategy Comparison")
+
+        if args.simulate:
+            from src.calculator import SECONDS_PER_DAY, timeframe_seconds
+            from src.price_store import PriceWindow
+            from src.simulation import DCAMonteCarlo
+
+            horizon = None
+            if args.simulation_days:
+                horizon = args.simulation_days * SECONDS_PER_DAY // timeframe_seconds(args.timeframe)
+            for pair, data in results.items():
+                # The closes are already in the results, whether or not they were streamed
+                r = data['results']
+                simulation = DCAMonteCarlo(
+                    PriceWindow(r.timestamps, {"Close": r.prices}),
+                    args.daily_investment * data['allocation'] / 100,
+                    args.buy_period, args.timeframe,
+                    paths=args.simulate, horizon=horizon, method=args.simulation_method
+                )
+                simulation.print_summary(console, f"🎲 {pair} Monte Carlo Outcomes")
+
         # Generate charts based on plot-type
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            if args.plot_type in ["all", "both"]:
-                individual_task = progress.add_task("[cyan]Generating individual charts...", total=len(results))
-                for pair, data in results.items():
-                    token = pair.split("/")[0]
-                    visualizer = DCAVisualizer(data["results"], token, start_date, end_date)
-                    visualizer.plot_single_pair(timestamp)
-                    progress.advance(individual_task)
-
-            if args.plot_type in ["total", "both"]:
-                portfolio_task = progress.add_task("[cyan]Generating portfolio chart...", total=1)
-                first_pair = list(results.keys())[0]
-                first_data = results[first_pair]["results"]
-                visualizer = DCAVisualizer(first_data, "PORTFOLIO", start_date, end_date)
-                visualizer.plot_total_portfolio(results, timestamp)
-                progress.advance(portfolio_task)
+        if args.plot_type != "none":
+            from rich.progress import Progress, SpinnerColumn, TextColumn
+            from src.visualizer import DCAVisualizer, render_pair_charts
+
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                if args.plot_type in ["all", "both"]:
+                    individual_task = progress.add_task("[cyan]Generating individual charts...", total=len(results))
+                    render_pair_charts(
+                        results, start_date, end_date, timestamp,
+                        dpi=args.chart_dpi,
+                        image_format=args.chart_format,
+                        max_workers=args.chart_workers,
+                        on_done=lambda pair: progress.advance(individual_task),
+                        rolling=args.plot_rolling
+                    )
+
+                if args.plot_type in ["total", "both"]:
+                    portfolio_task = progress.add_task("[cyan]Generating portfolio chart...", total=1)
+                    first_pair = list(results.keys())[0]
+                    first_data = results[first_pair]["results"]
+                    visualizer = DCAVisualizer(
+                        first_data, "PORTFOLIO", start_date, end_date, args.chart_dpi, args.chart_format
+                    )
+                    visualizer.plot_total_portfolio(results, timestamp)
+                    progress.advance(portfolio_task)
+
+        if args.profile:
+            profiler.print_report(console)
+        if args.profile_output:
+            profiler.write(args.profile_output)
 
         # Show completion message
         console.print(Panel(
@@ -162,6 +390,8 @@ def main():
             border_style="red"
         ))
         raise
+    finally:
+        flush_recording(exchange)
 
 if __name__ == "__main__":
     main()
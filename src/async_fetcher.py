@@ -0,0 +1,155 @@
+import asyncio
+import ccxt
+import numpy as np
+import ccxt.async_support as ccxt_async
+from rich.console import Console
+from .price_fetcher import PAGE_SIZE, PriceDataFetcher
+from .profiling import profiler
+
+console = Console()
+
+
+class AsyncPriceDataFetcher(PriceDataFetcher):
+    """Fetches several symbols at once from one ``ccxt.async_support`` client.
+
+    All symbols draw from the exchange's shared token bucket, so the exchange
+    sees a single rate-limit budget however many fetches are in flight, while
+    ``max_concurrency`` bounds how many of them run at the same time.
+    """
+
+    def __init__(self, exchange_id="binance", progress_context=None, cache=None, offline=False,
+                 max_concurrency=5, fetch_workers=4, compact=False, price_dtype=np.float64):
+        super().__init__(
+            exchange_id, progress_context, cache, offline, fetch_workers=fetch_workers, compact=compact,
+            price_dtype=price_dtype
+        )
+        self.max_concurrency = max_concurrency
+
+    def _initialize_exchange(self, exchange_id):
+        try:
+            exchange_class = getattr(ccxt_async, exchange_id)
+            return exchange_class({"enableRateLimit": False})
+        except (AttributeError, Exception) as e:
+            console.print(
+                f"[yellow]Error initializing exchange {exchange_id}: {e}[/yellow]"
+            )
+            console.print("[yellow]Falling back to Binance...[/yellow]")
+            return ccxt_async.binance({"enableRateLimit": False})
+
+    async def close(self):
+        await self.exchange.close()
+
+    async def fetch_many(self, symbols, start_date, end_date, timeframe="1d", windows=False):
+        """Yield ``(symbol, DataFrame)`` pairs in the order the fetches finish.
+
+        With ``windows=True`` each symbol comes back as a ``PriceWindow`` from
+        ``fetch_window`` instead.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        fetch = self.fetch_window if windows else self.fetch_historical_data
+
+        async def fetch_one(symbol):
+            async with semaphore:
+                return symbol, await fetch(symbol, start_date, end_date, timeframe=timeframe)
+
+        for future in asyncio.as_completed([fetch_one(symbol) for symbol in symbols]):
+            yield await future
+
+    async def fetch_historical_data(self, symbol, start_date, end_date, task_id=None, timeframe="1d"):
+        start_ts = int(start_date.timestamp() * 1000)
+        end_ts = int(end_date.timestamp() * 1000)
+
+        if self.cache is None:
+            data, _ = await self._fetch_range(symbol, timeframe, start_ts, end_ts, task_id)
+            return self._process_ohlcv_data(data, timeframe)
+        return await self._fetch_with_cache(symbol, timeframe, start_ts, end_ts, task_id)
+
+    async def fetch_window(self, symbol, start_date, end_date, task_id=None, timeframe="1d"):
+        start_ts = int(start_date.timestamp() * 1000)
+        end_ts = int(end_date.timestamp() * 1000)
+        await self._sync_cache(symbol, timeframe, start_ts, end_ts, task_id)
+        return self._cached_window(symbol, timeframe, start_ts, end_ts)
+
+    async def _fetch_with_cache(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        fresh = await self._sync_cache(symbol, timeframe, start_ts, end_ts, task_id)
+        return self._load_cached_range(symbol, timeframe, start_ts, end_ts, fresh)
+
+    async def _sync_cache(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        cached = self.cache.load(self.exchange.id, symbol, timeframe)
+        last_closed_ts = self._last_closed_ts(timeframe)
+        fresh = []
+
+        for lo, hi in self._ranges_to_fetch(cached, start_ts, end_ts):
+            try:
+                rows, reached_ts = await self._fetch_range(symbol, timeframe, lo, hi, task_id)
+            except (ccxt.NetworkError, ccxt.ExchangeError):
+                if cached is None:
+                    raise
+                self._warn_stale_cache(symbol)
+                break
+            fresh.append(self._store_fetched(symbol, timeframe, lo, rows, reached_ts, last_closed_ts))
+
+        return fresh
+
+    async def _fetch_range(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        segments = self._split_range(timeframe, start_ts, end_ts)
+        if len(segments) == 1 or self.fetch_workers <= 1:
+            return await self._fetch_segment(symbol, timeframe, start_ts, end_ts, task_id)
+
+        semaphore = asyncio.Semaphore(self.fetch_workers)
+
+        async def fetch_segment(lo, hi):
+            async with semaphore:
+                return await self._fetch_segment(symbol, timeframe, lo, hi, task_id)
+
+        outcomes = await asyncio.gather(*(fetch_segment(lo, hi) for lo, hi in segments), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(outcome, ccxt.ExchangeError):
+                raise outcome
+        return self._collect(symbol, timeframe, self._join_segments(segments, outcomes))
+
+    async def _fetch_segment(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        data = []
+        current = start_ts
+        reached_ts = end_ts
+        retry_count = 0
+
+        while current < end_ts:
+            try:
+                self._report_progress(symbol, current, task_id)
+                delay = self.limiter.reserve()
+                if delay > 0:
+                    profiler.count("rate_limit_sleep_seconds", delay)
+                    await asyncio.sleep(delay)
+                with profiler.span("fetch_page", symbol=symbol):
+                    ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, current, PAGE_SIZE)
+                self._count_page(ohlcv)
+                if not ohlcv:
+                    break
+
+                page = np.asarray(ohlcv, dtype=np.float64)
+                page = page[page[:, 0] <= end_ts]
+                if len(page):
+                    data.append(page)
+
+                if not len(page) or page[-1, 0] >= end_ts:
+                    break
+
+                current = ohlcv[-1][0] + timeframe_ms  # Move to the next bar
+                retry_count = 0
+
+            except ccxt.NetworkError as e:
+                retry_count += 1
+                wait_time = self._retry_delay(e, symbol, retry_count, task_id)
+                profiler.count("retry_backoff_seconds", wait_time)
+                await asyncio.sleep(wait_time)
+
+            except ccxt.ExchangeError as e:
+                self._report_exchange_error(e, symbol)
+                if not data:
+                    raise
+                reached_ts = int(data[-1][-1, 0])
+                break
+
+        return (np.concatenate(data) if data else np.empty((0, 6))), reached_ts
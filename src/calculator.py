@@ -1,39 +1,97 @@
+import re
 import numpy as np
 from datetime import datetime
+from .profiling import profiler
+from .results import DCAResult
+
+
+SECONDS_PER_DAY = 86400
+# Buy periods use "m" for months, so minutes are spelled "min"
+BUY_PERIOD_SECONDS = {"min": 60, "h": 3600, "d": SECONDS_PER_DAY, "w": 7 * SECONDS_PER_DAY, "m": 30 * SECONDS_PER_DAY}
+# Candle timeframes follow ccxt, where "m" is minutes
+TIMEFRAME_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": SECONDS_PER_DAY, "w": 7 * SECONDS_PER_DAY}
+
+
+def parse_buy_period_seconds(period):
+    """Convert a buy period such as 4h, 30min, 1d, 2w or 1m to seconds"""
+    match = re.fullmatch(r"(\d+)(min|h|d|w|m)", period.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid buy period format: {period}. Use format like 30min, 4h, 1d, 1w, 2w, 1m")
+    return int(match.group(1)) * BUY_PERIOD_SECONDS[match.group(2)]
+
+
+def timeframe_seconds(timeframe):
+    """Convert a ccxt timeframe such as 1m, 1h or 1d to seconds"""
+    match = re.fullmatch(r"(\d+)([smhdw])", timeframe.strip())
+    if not match:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+    return int(match.group(1)) * TIMEFRAME_SECONDS[match.group(2)]
+
+
+def bars_per_buy(buy_period, timeframe="1d"):
+    """Number of ``timeframe`` bars between two buys"""
+    period_seconds = parse_buy_period_seconds(buy_period)
+    bar_seconds = timeframe_seconds(timeframe)
+    if period_seconds < bar_seconds or period_seconds % bar_seconds:
+        raise ValueError(f"Buy period {buy_period} is not a whole number of {timeframe} bars")
+    return period_seconds // bar_seconds
+
+
+def periods_per_year(timeframe="1d"):
+    """Bars per year, used to annualize volatility and Sharpe ratio"""
+    return 365 * SECONDS_PER_DAY / timeframe_seconds(timeframe)
+
+
+def price_arrays(price_data):
+    """Millisecond timestamps and close prices of a DataFrame or ``PriceWindow``.
+
+    Memory-mapped windows come back as views, nothing is copied. float32
+    prices stay float32; anything else is returned as float64.
+    """
+    timestamps = np.asarray(price_data["Start"], dtype="datetime64[ms]").view(np.int64)
+    closes = np.asarray(price_data["Close"])
+    if closes.dtype != np.float32:
+        closes = closes.astype(np.float64, copy=False)
+    return timestamps, closes
+
 
 class DCACalculator:
-    def __init__(self, price_data, daily_investment=1.0, buy_period="1d"):
+    """Backtest a buy schedule over ``price_data`` in one vectorized pass.
+
+    ``strategy`` decides how much each bar invests: a kernel (see
+    ``src/strategies.py``) called with the close prices and the fixed
+    schedule, or a strategy name such as ``"buy-the-dip:3"``. Without one
+    every ``buy_period`` gets the same amount.
+    """
+
+    def __init__(self, price_data, daily_investment=1.0, buy_period="1d", timeframe="1d", strategy=None):
+        if isinstance(strategy, str):
+            from .strategies import get_strategy
+
+            strategy = get_strategy(strategy)
+        self.strategy = strategy
         self.price_data = price_data
         self.daily_investment = daily_investment
-        self.buy_period = self._parse_buy_period(buy_period)
-        self.results = self._calculate_dca()
-
-    def _parse_buy_period(self, period):
-        """Convert period string to number of days"""
-        units = {"d": 1, "w": 7, "m": 30}
-        number = int(period[:-1])
-        unit = period[-1].lower()
-        if unit not in units:
-            raise ValueError(f"Invalid buy period format: {period}. Use format like 1d, 1w, 2w, 1m")
-        return number * units[unit]
+        self.timeframe = timeframe
+        # buy_period is counted in bars; each buy invests daily_investment for every day it covers
+        self.buy_period = bars_per_buy(buy_period, timeframe)
+        self.investment_per_buy = daily_investment * parse_buy_period_seconds(buy_period) / SECONDS_PER_DAY
+        self.periods_per_year = periods_per_year(timeframe)
+        with profiler.span("dca_calculation"):
+            profiler.count("bars_calculated", len(price_data))
+            self.results = self._calculate_dca()
 
     def _calculate_dca(self):
-        dates = self.price_data["Start"].tolist()
-        prices = np.array(self.price_data["Close"].tolist())
-        
-        # Initialize arrays for vectorized operations
-        investments = np.zeros(len(dates))
-        crypto_amounts = np.zeros(len(dates))
-        days_since_buy = 0
+        timestamps, closes = price_arrays(self.price_data)
+        # Sums and ratios are always taken in float64, float32 closes are only stored as such
+        prices = closes.astype(np.float64, copy=False)
         
-        # Calculate buy points
-        for i in range(len(dates)):
-            days_since_buy += 1
-            if days_since_buy >= self.buy_period:
-                investment = self.daily_investment * self.buy_period
-                investments[i] = investment
-                crypto_amounts[i] = investment / prices[i]
-                days_since_buy = 0
+        # Buy on every buy_period-th bar, counting the first bar as bar one
+        investments = np.zeros(len(prices))
+        investments[self.buy_period - 1::self.buy_period] = self.investment_per_buy
+        if self.strategy is not None:
+            investments = np.asarray(self.strategy(prices, investments, self.timeframe), dtype=np.float64)
+        crypto_amounts = investments / prices
         
         # Cumulative calculations
         total_invested = np.cumsum(investments)
@@ -54,9 +112,11 @@ class DCACalculator:
         lowest_idx = np.argmin(prices)
         
         # Calculate drawdown and markup periods
+        # Days before the first buy have no position and therefore no drawdown
         rolling_max = np.maximum.accumulate(current_values)
-        drawdowns = (current_values - rolling_max) / rolling_max * 100
-        max_drawdown = np.min(drawdowns)
+        held = rolling_max > 0
+        drawdowns = (current_values[held] - rolling_max[held]) / rolling_max[held] * 100
+        max_drawdown = np.min(drawdowns) if drawdowns.size else 0.0
         
         # Calculate positive and negative days
         invested_mask = total_invested > 0
@@ -65,33 +125,239 @@ class DCACalculator:
         
         # Calculate volatility
         daily_returns = np.diff(prices) / prices[:-1]
-        volatility = np.std(daily_returns) * np.sqrt(365) * 100
+        volatility = np.std(daily_returns) * np.sqrt(self.periods_per_year) * 100
         
         # Calculate Sharpe ratio (assuming risk-free rate of 2%)
         risk_free_rate = 0.02
-        excess_returns = daily_returns - (risk_free_rate / 365)
-        sharpe_ratio = np.sqrt(365) * np.mean(excess_returns) / np.std(daily_returns) if len(daily_returns) > 0 else 0
+        excess_returns = daily_returns - (risk_free_rate / self.periods_per_year)
+        sharpe_ratio = np.sqrt(self.periods_per_year) * np.mean(excess_returns) / np.std(daily_returns) if len(daily_returns) > 0 else 0
         
-        return {
-            "dates": dates,
-            "prices": prices.tolist(),
-            "dca_prices": dca_prices.tolist(),
-            "pnl_percentages": pnl_percentages.tolist(),
-            "total_invested": total_invested[-1],
-            "total_crypto": total_crypto[-1],
-            "highest_price": prices[highest_idx],
-            "lowest_price": prices[lowest_idx],
-            "best_day": (prices[highest_idx], dates[highest_idx]),
-            "worst_day": (prices[lowest_idx], dates[lowest_idx]),
-            "avg_price": np.mean(prices),
-            "cost_basis": dca_prices[-1],
-            "current_value": current_values[-1],
-            "fear_index": (negative_pnl_days / total_invested_days * 100) if total_invested_days > 0 else 0,
-            "negative_pnl_days": int(negative_pnl_days),
-            "total_days": int(total_invested_days),
-            "max_drawdown": max_drawdown,
-            "volatility": volatility,
-            "sharpe_ratio": sharpe_ratio,
-            "values": current_values.tolist(),
-            "costs": total_invested.tolist()
-        }
+        return DCAResult(
+            timestamps,
+            best_index=highest_idx,
+            timeframe=self.timeframe,
+            worst_index=lowest_idx,
+            prices=closes,
+            dca_prices=dca_prices,
+            pnl_percentages=pnl_percentages,
+            values=current_values,
+            costs=total_invested,
+            total_invested=total_invested[-1],
+            total_crypto=total_crypto[-1],
+            highest_price=prices[highest_idx],
+            lowest_price=prices[lowest_idx],
+            avg_price=np.mean(prices),
+            cost_basis=dca_prices[-1],
+            current_value=current_values[-1],
+            fear_index=(negative_pnl_days / total_invested_days * 100) if total_invested_days > 0 else 0,
+            negative_pnl_days=int(negative_pnl_days),
+            total_days=int(total_invested_days),
+            max_drawdown=max_drawdown,
+            volatility=volatility,
+            sharpe_ratio=sharpe_ratio,
+        )
+
+
+class IncrementalDCACalculator:
+    """DCA calculator that can be extended with new candles as they arrive.
+
+    Instead of recomputing every cumulative sum over the full history, it
+    keeps running totals (invested, crypto held, rolling value maximum,
+    negative-PnL day count) and Welford accumulators for the return mean and
+    variance, so each ``update()`` costs O(1) and ``results`` matches what
+    ``DCACalculator`` reports for the same candles. ``extend()`` applies a
+    whole batch with NumPy and merges it into the same running state.
+    """
+
+    RISK_FREE_RATE = 0.02
+    _SERIES = ("timestamps", "prices", "dca_prices", "pnl_percentages", "values", "costs")
+
+    def __init__(self, price_data=None, daily_investment=1.0, buy_period="1d", timeframe="1d",
+                 price_dtype=np.float64):
+        self.daily_investment = daily_investment
+        self.timeframe = timeframe
+        self.buy_period = bars_per_buy(buy_period, timeframe)
+        self.investment_per_buy = daily_investment * parse_buy_period_seconds(buy_period) / SECONDS_PER_DAY
+        self.periods_per_year = periods_per_year(timeframe)
+        self.count = 0
+        self.total_invested = 0.0
+        self.total_crypto = 0.0
+        self.rolling_max = 0.0
+        self.max_drawdown = 0.0
+        self.negative_pnl_days = 0
+        self.total_days = 0
+        self.price_sum = 0.0
+        self.best_index = 0
+        self.worst_index = 0
+        self.last_price = None
+        # Welford accumulators over bar-to-bar returns
+        self.return_count = 0
+        self.return_mean = 0.0
+        self.return_m2 = 0.0
+        dtypes = {"timestamps": np.int64, "prices": price_dtype}
+        self._buffers = {name: np.empty(1024, dtype=dtypes.get(name, np.float64)) for name in self._SERIES}
+        if price_data is not None:
+            self.extend(price_data)
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(self._buffers["prices"])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self.count] = buffer[:self.count]
+            self._buffers[name] = grown
+
+    def update(self, timestamp, close):
+        """Add a single candle"""
+        if not isinstance(timestamp, (int, np.integer)):
+            timestamp = np.datetime64(timestamp, "ms").astype(np.int64)
+        price = float(close)
+        index = self.count
+
+        if (index + 1) % self.buy_period == 0:
+            investment = self.investment_per_buy
+            self.total_invested += investment
+            self.total_crypto += investment / price
+
+        if self.last_price is not None:
+            daily_return = (price - self.last_price) / self.last_price
+            self.return_count += 1
+            delta = daily_return - self.return_mean
+            self.return_mean += delta / self.return_count
+            self.return_m2 += delta * (daily_return - self.return_mean)
+        self.last_price = price
+
+        if self.total_crypto > 0:
+            dca_price = self.total_invested / self.total_crypto
+            pnl_percentage = (price - dca_price) / dca_price * 100
+        else:
+            dca_price, pnl_percentage = price, 0.0
+        value = self.total_crypto * price
+        self.rolling_max = max(self.rolling_max, value)
+        if self.rolling_max > 0:
+            self.max_drawdown = min(self.max_drawdown, (value - self.rolling_max) / self.rolling_max * 100)
+        if self.total_invested > 0:
+            self.total_days += 1
+            self.negative_pnl_days += value < self.total_invested
+
+        self.price_sum += price
+        if index == 0 or price > self._buffers["prices"][self.best_index]:
+            self.best_index = index
+        if index == 0 or price < self._buffers["prices"][self.worst_index]:
+            self.worst_index = index
+
+        self._reserve(1)
+        row = (timestamp, price, dca_price, pnl_percentage, value, self.total_invested)
+        for name, item in zip(self._SERIES, row):
+            self._buffers[name][index] = item
+        self.count += 1
+
+    def extend(self, price_data):
+        """Add a batch of candles (a DataFrame or ``PriceWindow``) in one vectorized step"""
+        timestamps, prices = price_arrays(price_data)
+        if len(prices) == 0:
+            return
+        prices = prices.astype(np.float64, copy=False)
+
+        # Buy schedule continues from the global bar index
+        bar_index = self.count + np.arange(len(prices))
+        buys = (bar_index + 1) % self.buy_period == 0
+        investments = np.where(buys, self.investment_per_buy, 0.0)
+        total_invested = self.total_invested + np.cumsum(investments)
+        total_crypto = self.total_crypto + np.cumsum(investments / prices)
+
+        nonzero_crypto = np.where(total_crypto > 0, total_crypto, np.inf)
+        dca_prices = np.where(total_crypto > 0, total_invested / nonzero_crypto, prices)
+        pnl_percentages = np.where(total_crypto > 0, (prices - dca_prices) / dca_prices * 100, 0.0)
+        values = total_crypto * prices
+
+        rolling_max = np.maximum(self.rolling_max, np.maximum.accumulate(values))
+        held = rolling_max > 0
+        if held.any():
+            drawdowns = (values[held] - rolling_max[held]) / rolling_max[held] * 100
+            self.max_drawdown = min(self.max_drawdown, drawdowns.min())
+        invested_mask = total_invested > 0
+        self.total_days += int(invested_mask.sum())
+        self.negative_pnl_days += int(((values < total_invested) & invested_mask).sum())
+
+        # Merge the batch's return statistics into the running Welford state
+        previous = prices if self.last_price is None else np.concatenate([[self.last_price], prices])
+        returns = np.diff(previous) / previous[:-1]
+        if len(returns):
+            batch_mean = returns.mean()
+            batch_m2 = ((returns - batch_mean) ** 2).sum()
+            combined = self.return_count + len(returns)
+            delta = batch_mean - self.return_mean
+            self.return_m2 += batch_m2 + delta ** 2 * self.return_count * len(returns) / combined
+            self.return_mean += delta * len(returns) / combined
+            self.return_count = combined
+
+        best, worst = int(np.argmax(prices)), int(np.argmin(prices))
+        if self.count == 0 or prices[best] > self._buffers["prices"][self.best_index]:
+            self.best_index = self.count + best
+        if self.count == 0 or prices[worst] < self._buffers["prices"][self.worst_index]:
+            self.worst_index = self.count + worst
+
+        self._reserve(len(prices))
+        batch = (timestamps, prices, dca_prices, pnl_percentages, values, total_invested)
+        for name, column in zip(self._SERIES, batch):
+            self._buffers[name][self.count:self.count + len(prices)] = column
+
+        self.count += len(prices)
+        self.total_invested = float(total_invested[-1])
+        self.total_crypto = float(total_crypto[-1])
+        self.rolling_max = float(rolling_max[-1])
+        self.price_sum += prices.sum()
+        self.last_price = float(prices[-1])
+
+    @property
+    def last_timestamp(self):
+        """Millisecond timestamp of the latest candle added"""
+        return int(self._buffers["timestamps"][self.count - 1]) if self.count else None
+
+    @property
+    def volatility(self):
+        if self.return_count == 0:
+            return np.nan
+        return np.sqrt(self.return_m2 / self.return_count) * np.sqrt(self.periods_per_year) * 100
+
+    @property
+    def sharpe_ratio(self):
+        if self.return_count == 0:
+            return 0
+        std = np.sqrt(self.return_m2 / self.return_count)
+        excess_mean = self.return_mean - self.RISK_FREE_RATE / self.periods_per_year
+        return np.sqrt(self.periods_per_year) * excess_mean / std if std > 0 else np.inf * np.sign(excess_mean)
+
+    @property
+    def results(self):
+        series = {name: self._buffers[name][:self.count] for name in self._SERIES}
+        prices = series["prices"]
+        return DCAResult(
+            series["timestamps"],
+            best_index=self.best_index,
+            timeframe=self.timeframe,
+            worst_index=self.worst_index,
+            prices=prices,
+            dca_prices=series["dca_prices"],
+            pnl_percentages=series["pnl_percentages"],
+            values=series["values"],
+            costs=series["costs"],
+            total_invested=self.total_invested,
+            total_crypto=self.total_crypto,
+            highest_price=prices[self.best_index],
+            lowest_price=prices[self.worst_index],
+            avg_price=self.price_sum / self.count,
+            cost_basis=series["dca_prices"][-1],
+            current_value=series["values"][-1],
+            fear_index=(self.negative_pnl_days / self.total_days * 100) if self.total_days > 0 else 0,
+            negative_pnl_days=self.negative_pnl_days,
+            total_days=self.total_days,
+            max_drawdown=self.max_drawdown,
+            volatility=self.volatility,
+            sharpe_ratio=self.sharpe_ratio,
+        )
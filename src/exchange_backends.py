@@ -0,0 +1,148 @@
+import bisect
+import json
+import os
+import random
+import re
+import threading
+import time
+import ccxt
+
+
+def _recording_path(record_dir, exchange_id, symbol, timeframe):
+    safe_symbol = re.sub(r"[^A-Za-z0-9_-]", "_", symbol)
+    return os.path.join(record_dir, exchange_id, f"{safe_symbol}_{timeframe}.json")
+
+
+def _load_recording(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+class RecordingExchange:
+    """Wraps a live ccxt exchange and saves every ``fetch_ohlcv`` response to disk.
+
+    Candles are merged per (symbol, timeframe) into one JSON file under
+    ``record_dir/<exchange id>/`` so a later ``ReplayExchange`` can serve any
+    page of the recorded range. Pages are collected in memory and written
+    by ``flush()`` (or ``close()``), once per file however many pages were
+    recorded. Everything else is delegated to the wrapped exchange.
+    """
+
+    def __init__(self, exchange, record_dir):
+        self._exchange = exchange
+        self.record_dir = record_dir
+        self._recordings = {}
+        self._dirty = set()
+        # Concurrent segment fetches of one symbol record into the same file
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self._exchange, name)
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params={}):
+        ohlcv = self._exchange.fetch_ohlcv(symbol, timeframe, since, limit, params)
+        path = _recording_path(self.record_dir, self._exchange.id, symbol, timeframe)
+        with self._lock_for(path):
+            if path not in self._recordings:
+                self._recordings[path] = {row[0]: row for row in _load_recording(path)}
+            self._recordings[path].update((row[0], row) for row in ohlcv)
+            self._dirty.add(path)
+        return ohlcv
+
+    def flush(self):
+        """Write every recording that changed since the last flush"""
+        for path in sorted(self._dirty):
+            with self._lock_for(path):
+                candles = self._recordings[path]
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Readers never see a half-written file
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump([candles[ts] for ts in sorted(candles)], f)
+                os.replace(tmp_path, path)
+                self._dirty.discard(path)
+
+    def close(self):
+        self.flush()
+
+    def _lock_for(self, path):
+        with self._locks_lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+
+class ReplayExchange:
+    """Offline stand-in for a ccxt exchange that serves recorded candles.
+
+    ``fetch_ohlcv`` answers from the recordings written by
+    ``RecordingExchange`` (or from in-memory ``candles`` keyed by
+    ``(symbol, timeframe)``), with optional per-request ``latency`` in
+    seconds, a ``page_limit`` smaller than the requested limit, and a
+    ``fault_rate`` probability of raising ``RateLimitExceeded`` or
+    ``NetworkError`` so retry behaviour can be exercised deterministically
+    via ``seed``. Injected rate limits carry a ``Retry-After`` of
+    ``retry_after`` seconds when given. ``calls`` and ``faults`` count what
+    was served.
+    """
+
+    def __init__(self, record_dir=None, exchange_id="binance", candles=None, latency=0.0,
+                 page_limit=None, fault_rate=0.0, seed=None, rate_limit=0, now=None,
+                 retry_after=None):
+        self.id = exchange_id
+        self.name = f"{exchange_id} (replay)"
+        self.rateLimit = rate_limit
+        self.record_dir = record_dir
+        self.latency = latency
+        self.page_limit = page_limit
+        self.fault_rate = fault_rate
+        self.now = now
+        self.retry_after = retry_after
+        self.last_response_headers = {}
+        self.calls = 0
+        self.faults = 0
+        self._random = random.Random(seed)
+        self._candles = {}
+        for key, rows in (candles or {}).items():
+            self._add_series(key, rows)
+
+    def _add_series(self, key, rows):
+        self._candles[key] = ([row[0] for row in rows], rows)
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    def milliseconds(self):
+        return self.now if self.now is not None else int(time.time() * 1000)
+
+    def _series(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._candles:
+            if self.record_dir is None:
+                raise ccxt.BadSymbol(f"{self.id} has no recorded candles for {symbol} {timeframe}")
+            path = _recording_path(self.record_dir, self.id, symbol, timeframe)
+            if not os.path.exists(path):
+                raise ccxt.BadSymbol(f"No recording for {symbol} {timeframe} at {path}")
+            self._add_series(key, _load_recording(path))
+        return self._candles[key]
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params={}):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fault_rate and self._random.random() < self.fault_rate:
+            self.faults += 1
+            if self._random.random() < 0.5:
+                if self.retry_after is not None:
+                    self.last_response_headers = {"Retry-After": str(self.retry_after)}
+                raise ccxt.RateLimitExceeded(f"{self.id} replay: injected rate limit")
+            raise ccxt.NetworkError(f"{self.id} replay: injected network error")
+
+        self.last_response_headers = {}
+        timestamps, candles = self._series(symbol, timeframe)
+        start = bisect.bisect_left(timestamps, since) if since is not None else 0
+        limits = [n for n in (limit, self.page_limit) if n]
+        end = start + min(limits) if limits else len(candles)
+        return candles[start:end]
@@ -0,0 +1,115 @@
+import os
+import numpy as np
+from .portfolio import PortfolioAggregate
+from .profiling import profiler
+
+EXPORT_FORMATS = ("npz", "parquet")
+# Result series under the column names used in the exported tables
+SERIES_COLUMNS = {
+    "prices": "price", "dca_prices": "dca_price", "pnl_percentages": "pnl_percentage",
+    "values": "value", "costs": "cost",
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_results(all_results, path, export_format="npz", compression=None, portfolio=None):
+    """Write every pair's full result series and the portfolio totals, returning the written paths.
+
+    ``npz`` writes one NumPy archive with ``"<pair>:<column>"`` arrays next
+    to ``"portfolio:<column>"`` ones (``compression`` set to anything but
+    ``"none"`` uses zip deflate). ``parquet`` needs pyarrow and writes
+    ``<path>.parquet`` with one row per pair and bar plus
+    ``<path>_portfolio.parquet``; ``compression`` is the Parquet codec
+    (``zstd``, ``snappy``, ``gzip``, ...). Timestamps stay int64 epoch
+    milliseconds and prices keep their dtype.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}. Use one of {', '.join(EXPORT_FORMATS)}")
+    portfolio = portfolio or PortfolioAggregate(all_results)
+    with profiler.span("export", format=export_format, pairs=len(all_results)):
+        if export_format == "parquet":
+            paths = _write_parquet(all_results, portfolio, path, compression)
+        else:
+            paths = [_write_npz(all_results, portfolio, path, compression)]
+    profiler.count("export_bytes_written", sum(os.path.getsize(p) for p in paths))
+    return paths
+
+
+def _portfolio_columns(portfolio):
+    return {
+        "timestamp": portfolio.timestamps,
+        "total_value": portfolio.total_values,
+        "total_cost": portfolio.total_costs,
+        "pnl_percentage": portfolio.pnl_percentages,
+        "drawdown": portfolio.drawdowns,
+    }
+
+
+def _write_npz(all_results, portfolio, path, compression):
+    path = path if path.endswith(".npz") else path + ".npz"
+    arrays = {
+        "pairs": np.array(list(all_results)),
+        "allocations": np.array([data["allocation"] for data in all_results.values()], dtype=np.float64),
+    }
+    for pair, data in all_results.items():
+        r = data["results"]
+        arrays[f"{pair}:timestamp"] = r.timestamps
+        arrays.update((f"{pair}:{column}", r[name]) for name, column in SERIES_COLUMNS.items())
+    arrays.update((f"portfolio:{column}", values) for column, values in _portfolio_columns(portfolio).items())
+    arrays["portfolio:weights"] = portfolio.weights
+
+    save = np.savez_compressed if compression and compression != "none" else np.savez
+    save(path, **arrays)
+    return path
+
+
+def _write_parquet(all_results, portfolio, path, compression):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    base = path[:-len(".parquet")] if path.endswith(".parquet") else path
+    results = [data["results"] for data in all_results.values()]
+    lengths = [len(r.timestamps) for r in results]
+    # One long table; the pair column is dictionary-encoded so it costs a few bits per row
+    columns = {
+        "pair": pa.DictionaryArray.from_arrays(
+            np.repeat(np.arange(len(results), dtype=np.int32), lengths), list(all_results)
+        ),
+        "timestamp": pa.array(np.concatenate([r.timestamps for r in results]), type=pa.timestamp("ms")),
+    }
+    for name, column in SERIES_COLUMNS.items():
+        columns[column] = np.concatenate([r[name] for r in results])
+    compression = compression or "none"
+    pairs_path = base + ".parquet"
+    pq.write_table(pa.table(columns), pairs_path, compression=compression)
+
+    totals = _portfolio_columns(portfolio)
+    totals["timestamp"] = pa.array(totals["timestamp"], type=pa.timestamp("ms"))
+    for pair, weights in zip(all_results, portfolio.weights):
+        totals[f"weight:{pair}"] = weights
+    portfolio_path = base + "_portfolio.parquet"
+    pq.write_table(pa.table(totals), portfolio_path, compression=compression)
+    return [pairs_path, portfolio_path]
+
+
+def load_npz_export(path):
+    """Read an ``npz`` export back as ``{pair: DataFrame, "portfolio": DataFrame}``"""
+    import pandas as pd
+
+    with np.load(path) as archive:
+        frames = {}
+        for pair in archive["pairs"].tolist():
+            frame = pd.DataFrame({column: archive[f"{pair}:{column}"] for column in SERIES_COLUMNS.values()})
+            frame.index = pd.to_datetime(archive[f"{pair}:timestamp"], unit="ms")
+            frames[pair] = frame
+        totals = {column: archive[f"portfolio:{column}"] for column in ("total_value", "total_cost",
+                                                                        "pnl_percentage", "drawdown")}
+        frames["portfolio"] = pd.DataFrame(totals, index=pd.to_datetime(archive["portfolio:timestamp"], unit="ms"))
+    return frames
@@ -1,17 +1,35 @@
+import asyncio
+from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.layout import Layout
 from rich.table import Table
-from .price_fetcher import PriceDataFetcher
-from .calculator import DCACalculator
+from .price_fetcher import PAGE_SIZE, PriceDataFetcher
+from .calculator import DCACalculator, IncrementalDCACalculator
+from .profiling import profiler
 
 console = Console()
 
 class MultiPairDCAManager:
-    def __init__(self, exchange_id='binance'):
-        self.fetcher = PriceDataFetcher(exchange_id)
+    def __init__(self, exchange_id='binance', cache=None, offline=False, max_concurrency=1, exchange=None,
+                 fetch_workers=4, compact=False, price_dtype="float64"):
+        self.exchange_id = exchange_id
+        self.cache = cache
+        self.offline = offline
+        # Custom exchange backends are synchronous, so they always fetch sequentially
+        self.max_concurrency = max_concurrency if exchange is None else 1
+        self.fetch_workers = fetch_workers
+        self.compact = compact
+        self.price_dtype = price_dtype
+        self.fetcher = PriceDataFetcher(
+            exchange_id, cache=cache, offline=offline, exchange=exchange, fetch_workers=fetch_workers,
+            compact=compact, price_dtype=price_dtype
+        )
+        # A memory-mapped store hands the calculator zero-copy windows instead of DataFrames
+        self.use_windows = hasattr(cache, 'window')
         
-    def calculate_multiple_pairs(self, pairs_allocation, daily_investment, start_date, end_date, buy_period='1d'):
+    def calculate_multiple_pairs(self, pairs_allocation, daily_investment, start_date, end_date, buy_period='1d',
+                                 timeframe='1d', strategy=None):
         results = {}
         total_allocation = sum(pairs_allocation.values())
         
@@ -32,6 +50,8 @@ class MultiPairDCAManager:
             f"[cyan]Daily Investment:[/cyan] ${daily_investment:.2f}\n"
             f"[cyan]Period:[/cyan] {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}\n"
             f"[cyan]Buy Frequency:[/cyan] {buy_period}\n"
+            f"[cyan]Strategy:[/cyan] {strategy or 'fixed'}\n"
+            f"[cyan]Candles:[/cyan] {timeframe}\n"
             f"[cyan]Exchange:[/cyan] {self.fetcher.exchange.name.upper()}\n\n"
             "[bold]Selected Pairs:[/bold]\n" +
             "\n".join(f"[yellow]• {pair}:[/yellow] [cyan]{alloc}%[/cyan]" for pair, alloc in pairs_allocation.items()),
@@ -40,14 +60,102 @@ class MultiPairDCAManager:
         ))
         console.print("\n")
         
-        for pair, allocation in pairs_allocation.items():
-            pair_investment = daily_investment * (allocation / 100)
-            price_data = self.fetcher.fetch_historical_data(pair, start_date, end_date)
-            calculator = DCACalculator(price_data, pair_investment, buy_period)
-            results[pair] = {
-                'allocation': allocation,
-                'calculator': calculator,
-                'results': calculator.results
-            }
-        
-        return results
\ No newline at end of file
+        if self.max_concurrency > 1 and len(pairs_allocation) > 1:
+            results = asyncio.run(self._calculate_concurrently(
+                pairs_allocation, daily_investment, start_date, end_date, buy_period, timeframe, strategy
+            ))
+            # Keep the caller's pair order regardless of which fetch finished first
+            return {pair: results[pair] for pair in pairs_allocation}
+
+        # Strategies look at the whole history, so only plain DCA is calculated while streaming
+        if self.use_windows or strategy is not None:
+            fetch = self.fetcher.fetch_window if self.use_windows else self.fetcher.fetch_historical_data
+            for pair, allocation in pairs_allocation.items():
+                with profiler.span("fetch_pair", pair=pair):
+                    price_data = fetch(pair, start_date, end_date, timeframe=timeframe)
+                results[pair] = self._calculate_pair(
+                    price_data, allocation, daily_investment, buy_period, timeframe, strategy
+                )
+            return results
+
+        from rich.progress import Progress, SpinnerColumn, TextColumn
+
+        with Progress(SpinnerColumn(), TextColumn("{task.description}"), console=console, transient=True) as progress:
+            for pair, allocation in pairs_allocation.items():
+                task_id = progress.add_task(f"[yellow]Fetching {pair}[/yellow]")
+                results[pair] = self._stream_pair(
+                    pair, allocation, daily_investment, start_date, end_date, buy_period, timeframe,
+                    progress, task_id
+                )
+                progress.remove_task(task_id)
+                console.print(f"[green]✓[/green] {self._running_totals(pair, results[pair]['calculator'])}")
+
+        return results
+
+    def _stream_pair(self, pair, allocation, daily_investment, start_date, end_date, buy_period, timeframe,
+                     progress, task_id):
+        """Feed candle batches into an incremental calculator while the download is still running"""
+        calculator = IncrementalDCACalculator(
+            daily_investment=daily_investment * (allocation / 100), buy_period=buy_period, timeframe=timeframe,
+            price_dtype=self.price_dtype
+        )
+        with profiler.span("fetch_pair", pair=pair):
+            for batch in self.fetcher.fetch_historical_chunks(
+                pair, start_date, end_date, timeframe=timeframe, chunk_bars=PAGE_SIZE
+            ):
+                with profiler.span("calculate_batch", pair=pair, bars=len(batch)):
+                    calculator.extend(batch)
+                progress.update(task_id, description=self._running_totals(pair, calculator))
+        if not calculator.count:
+            raise ValueError(f"No price data available for {pair} on {self.fetcher.exchange.id}")
+        return {
+            'allocation': allocation,
+            'calculator': calculator,
+            'results': calculator.results
+        }
+
+    @staticmethod
+    def _running_totals(pair, calculator):
+        if calculator.last_timestamp is None:
+            return f"[yellow]{pair}[/yellow]: no candles yet"
+        latest = datetime.fromtimestamp(calculator.last_timestamp / 1000).strftime('%Y-%m-%d')
+        value = calculator.total_crypto * calculator.last_price
+        pnl = (value - calculator.total_invested) / calculator.total_invested * 100 if calculator.total_invested else 0.0
+        color = "green" if pnl >= 0 else "red"
+        return (
+            f"[yellow]{pair}[/yellow] through [cyan]{latest}[/cyan]: {calculator.count:,} bars, "
+            f"${calculator.total_invested:,.2f} invested, worth ${value:,.2f} "
+            f"([{color}]{pnl:+.2f}%[/{color}])"
+        )
+
+    async def _calculate_concurrently(self, pairs_allocation, daily_investment, start_date, end_date, buy_period,
+                                      timeframe, strategy=None):
+        # ccxt.async_support is only loaded when several pairs are fetched at once
+        from .async_fetcher import AsyncPriceDataFetcher
+
+        results = {}
+        fetcher = AsyncPriceDataFetcher(
+            self.exchange_id, cache=self.cache, offline=self.offline,
+            max_concurrency=self.max_concurrency, fetch_workers=self.fetch_workers,
+            compact=self.compact, price_dtype=self.price_dtype
+        )
+        try:
+            with profiler.span("fetch_all_pairs"):
+                async for pair, price_data in fetcher.fetch_many(
+                    list(pairs_allocation), start_date, end_date, timeframe, windows=self.use_windows
+                ):
+                    results[pair] = self._calculate_pair(
+                        price_data, pairs_allocation[pair], daily_investment, buy_period, timeframe, strategy
+                    )
+        finally:
+            await fetcher.close()
+        return results
+
+    def _calculate_pair(self, price_data, allocation, daily_investment, buy_period, timeframe='1d', strategy=None):
+        pair_investment = daily_investment * (allocation / 100)
+        calculator = DCACalculator(price_data, pair_investment, buy_period, timeframe, strategy)
+        return {
+            'allocation': allocation,
+            'calculator': calculator,
+            'results': calculator.results
+        }
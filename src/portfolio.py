@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+from .profiling import profiler
+
+MS_PER_YEAR = 365 * 86400 * 1000
+
+
+class PortfolioAggregate:
+    """All pairs of a multi-pair run aligned on one shared timeline.
+
+    Every pair's ``values`` and ``costs`` are placed on the union of all
+    timestamps and stacked into ``pairs x time`` matrices. A pair contributes
+    nothing before its first candle (e.g. a coin listed later) and is carried
+    forward over gaps and after its last one. Totals, weights, drawdown and
+    volatility are then computed on the matrices in one pass.
+    """
+
+    RISK_FREE_RATE = 0.02
+
+    def __init__(self, all_results):
+        self.pairs = list(all_results)
+        self.allocations = np.array([data["allocation"] for data in all_results.values()], dtype=np.float64)
+        with profiler.span("portfolio_aggregation", pairs=len(self.pairs)):
+            self._align([data["results"] for data in all_results.values()])
+            self._aggregate()
+
+    def _align(self, results):
+        self.timestamps = np.unique(np.concatenate([r.timestamps for r in results]))
+        self.values = np.zeros((len(results), len(self.timestamps)))
+        self.costs = np.zeros_like(self.values)
+        for row, r in enumerate(results):
+            # Index of each pair's latest candle at or before every shared timestamp
+            idx = np.searchsorted(r.timestamps, self.timestamps, side="right") - 1
+            listed = idx >= 0
+            self.values[row, listed] = r.values[idx[listed]]
+            self.costs[row, listed] = r.costs[idx[listed]]
+        self._dates = None
+
+    def _aggregate(self):
+        self.total_values = self.values.sum(axis=0)
+        self.total_costs = self.costs.sum(axis=0)
+        self.weights = np.divide(
+            self.values, self.total_values, out=np.zeros_like(self.values), where=self.total_values > 0
+        )
+        self.pnl_percentages = np.divide(
+            (self.total_values - self.total_costs) * 100, self.total_costs,
+            out=np.zeros_like(self.total_values), where=self.total_costs > 0
+        )
+
+        # Same drawdown definition as DCACalculator, on the portfolio value
+        rolling_max = np.maximum.accumulate(self.total_values)
+        held = rolling_max > 0
+        self.drawdowns = np.zeros_like(self.total_values)
+        self.drawdowns[held] = (self.total_values[held] - rolling_max[held]) / rolling_max[held] * 100
+        self.max_drawdown = self.drawdowns.min() if len(self.drawdowns) else 0.0
+
+        # Returns exclude the new money invested during each step
+        previous = self.total_values[:-1]
+        gains = np.diff(self.total_values) - np.diff(self.total_costs)
+        returns = gains[previous > 0] / previous[previous > 0]
+        bars_per_year = MS_PER_YEAR / np.median(np.diff(self.timestamps)) if len(self.timestamps) > 1 else 365
+        if len(returns) > 1 and returns.std() > 0:
+            self.volatility = returns.std() * np.sqrt(bars_per_year) * 100
+            excess = returns.mean() - self.RISK_FREE_RATE / bars_per_year
+            self.sharpe_ratio = np.sqrt(bars_per_year) * excess / returns.std()
+        else:
+            self.volatility, self.sharpe_ratio = 0.0, 0.0
+
+    @property
+    def dates(self):
+        if self._dates is None:
+            self._dates = pd.to_datetime(self.timestamps, unit="ms")
+        return self._dates
+
+    @property
+    def total_invested(self):
+        return self.total_costs[-1]
+
+    @property
+    def current_value(self):
+        return self.total_values[-1]
+
+    @property
+    def current_weights(self):
+        """Share of the portfolio value held in each pair at the last timestamp"""
+        return dict(zip(self.pairs, self.weights[:, -1] * 100))
@@ -1,5 +1,4 @@
 from datetime import datetime
-import pandas as pd
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -8,12 +7,14 @@ from rich import box
 from rich.style import Style
 from rich.layout import Layout
 from rich.live import Live
+from .portfolio import PortfolioAggregate
 
 console = Console()
 
 class PortfolioAnalyzer:
     def __init__(self, results):
         self.results = results
+        self.portfolio = PortfolioAggregate(results)
 
     def _format_currency(self, value):
         return f"${value:,.2f}"
@@ -91,8 +92,8 @@ class PortfolioAnalyzer:
             allocation, 25
         )  # Slightly reduced width for better layout
         daily_amount = (
-            results["total_invested"] / len(results["dates"])
-            if len(results["dates"]) > 0
+            results["total_invested"] / len(results.timestamps)
+            if len(results.timestamps) > 0
             else 0
         )
 
@@ -143,8 +144,10 @@ class PortfolioAnalyzer:
         }
 
     def display_portfolio_summary(self, timestamp=None):
-        total_invested = sum(data["results"]["total_invested"] for data in self.results.values())
-        total_value = sum(data["results"]["current_value"] for data in self.results.values())
+        portfolio = self.portfolio
+        total_invested = portfolio.total_invested
+        total_value = portfolio.current_value
+        weights = portfolio.current_weights
         total_pnl = total_value - total_invested
         total_pnl_percentage = (total_pnl / total_invested * 100) if total_invested > 0 else 0
 
@@ -160,6 +163,7 @@ class PortfolioAnalyzer:
         # Add columns with emoji icons
         table.add_column("💱 Pair", style="cyan")
         table.add_column("📊 Allocation", justify="right")
+        table.add_column("⚖️ Weight", justify="right")
         table.add_column("💰 Invested", justify="right")
         table.add_column("💎 Current Value", justify="right")
         table.add_column("📈 P/L", justify="right")
@@ -187,6 +191,7 @@ class PortfolioAnalyzer:
             table.add_row(
                 f"{pair} {trend}",
                 f"{data['allocation']}%",
+                f"{weights[pair]:.1f}%",
                 f"${results['total_invested']:,.2f}",
                 f"${results['current_value']:,.2f}",
                 f"[{color}]${pnl:,.2f}[/{color}]",
@@ -203,6 +208,7 @@ class PortfolioAnalyzer:
         table.add_row(
             f"[bold]📈 TOTAL {total_trend}[/bold]",
             "[bold]100%[/bold]",
+            "[bold]100%[/bold]",
             f"[bold]${total_invested:,.2f}[/bold]",
             f"[bold]${total_value:,.2f}[/bold]",
             f"[bold {total_color}]${total_pnl:,.2f}[/bold {total_color}]",
@@ -216,6 +222,8 @@ class PortfolioAnalyzer:
             f"💼 Total Portfolio Value: ${total_value:,.2f}\n"
             f"📊 Total Return: [{total_color}]{total_pnl_percentage:+.2f}%[/{total_color}]\n"
             f"🌡️ Average Fear Index: {avg_fear_index:.1f}% {total_mood}\n"
+            f"📉 Max Drawdown: {portfolio.max_drawdown:.2f}%\n"
+            f"〰️ Volatility: {portfolio.volatility:.2f}% (Sharpe {portfolio.sharpe_ratio:.2f})\n"
             f"📅 Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         )
 
@@ -226,6 +234,8 @@ class PortfolioAnalyzer:
         console.print("\n")
 
     def _save_analysis_to_csv(self, pair_stats, total_stats, filename):
+        import pandas as pd
+
         data = []
         for pair, stats in pair_stats.items():
             data.append(
@@ -0,0 +1,104 @@
+import os
+import re
+import numpy as np
+from .profiling import profiler
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class OHLCVCache:
+    """On-disk columnar cache of OHLCV candles.
+
+    Each (exchange, symbol, timeframe) lives in its own ``.npz`` file holding
+    one array per column plus the list of time ranges that have already been
+    fetched, so gaps and the missing tail can be requested on their own.
+    """
+
+    def __init__(self, cache_dir="dca/cache"):
+        self.cache_dir = cache_dir
+
+    def _path(self, exchange_id, symbol, timeframe):
+        safe_symbol = re.sub(r"[^A-Za-z0-9_-]", "_", symbol)
+        return os.path.join(self.cache_dir, exchange_id, f"{safe_symbol}_{timeframe}.npz")
+
+    def load(self, exchange_id, symbol, timeframe):
+        """Return ``(timestamps, columns, covered)`` or ``None`` if nothing is cached"""
+        path = self._path(exchange_id, symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        with profiler.span("cache_load", symbol=symbol), np.load(path) as f:
+            timestamps = f["timestamps"]
+            columns = {name: f[name] for name in OHLCV_COLUMNS}
+            covered = f["covered"]
+        return timestamps, columns, covered
+
+    def store(self, exchange_id, symbol, timeframe, timestamps, columns, covered):
+        path = self._path(exchange_id, symbol, timeframe)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        with profiler.span("cache_store", symbol=symbol):
+            self._write(tmp_path, timestamps, columns, covered)
+        profiler.count("cache_bytes_written", os.path.getsize(tmp_path))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write(path, timestamps, columns, covered):
+        np.savez(
+            path,
+            timestamps=np.asarray(timestamps, dtype=np.int64),
+            covered=np.asarray(covered, dtype=np.int64).reshape(-1, 2),
+            **{name: np.asarray(columns[name], dtype=np.float64) for name in OHLCV_COLUMNS},
+        )
+
+    def merge(self, exchange_id, symbol, timeframe, rows, fetched_range):
+        """Merge freshly fetched ``rows`` into the cache and mark ``fetched_range`` as covered"""
+        cached = self.load(exchange_id, symbol, timeframe)
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        timestamps = rows[:, 0].astype(np.int64)
+        columns = {name: rows[:, i + 1] for i, name in enumerate(OHLCV_COLUMNS)}
+        covered = np.asarray([fetched_range], dtype=np.int64)
+
+        if cached is not None:
+            old_ts, old_columns, old_covered = cached
+            # New rows win over cached ones with the same timestamp
+            keep = ~np.isin(old_ts, timestamps)
+            timestamps = np.concatenate([old_ts[keep], timestamps])
+            columns = {
+                name: np.concatenate([old_columns[name][keep], columns[name]])
+                for name in OHLCV_COLUMNS
+            }
+            covered = np.concatenate([old_covered, covered])
+
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        columns = {name: values[order] for name, values in columns.items()}
+        self.store(exchange_id, symbol, timeframe, timestamps, columns, _merge_ranges(covered))
+
+    @staticmethod
+    def missing_ranges(covered, start_ts, end_ts):
+        """Return the parts of ``[start_ts, end_ts]`` not yet covered by the cache"""
+        missing = []
+        cursor = start_ts
+        for lo, hi in _merge_ranges(covered):
+            if hi < cursor:
+                continue
+            if lo > end_ts:
+                break
+            if lo > cursor:
+                missing.append((cursor, lo - 1))
+            cursor = max(cursor, hi + 1)
+        if cursor <= end_ts:
+            missing.append((cursor, end_ts))
+        return missing
+
+
+def _merge_ranges(ranges):
+    """Sort and coalesce overlapping or touching ``[lo, hi]`` ranges"""
+    ranges = sorted((int(lo), int(hi)) for lo, hi in np.asarray(ranges).reshape(-1, 2))
+    merged = []
+    for lo, hi in ranges:
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return merged
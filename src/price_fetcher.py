@@ -1,118 +1,461 @@
 import ccxt
+import numpy as np
 import pandas as pd
-import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
+from .price_cache import OHLCV_COLUMNS
+from .price_store import PriceWindow
+from .profiling import profiler
+from .rate_limiter import backoff_delay, limiter_for, retry_after_seconds
 
 console = Console()
 
+# Rows per fetch_ohlcv request
+PAGE_SIZE = 1000
+# Pages per independently fetched segment of a long backfill
+SEGMENT_PAGES = 5
+# Retries per page before giving up; with the jittered backoff that is about 30s in total
+MAX_RETRIES = 6
+MS_PER_DAY = 86_400_000
+
 
 class PriceDataFetcher:
-    def __init__(self, exchange_id="binance", progress_context=None):
-        self.exchange = self._initialize_exchange(exchange_id)
+    def __init__(self, exchange_id="binance", progress_context=None, cache=None, offline=False,
+                 exchange=None, fetch_workers=4, compact=False, price_dtype=np.float64):
+        # A ready-made exchange (e.g. a ReplayExchange) replaces the live ccxt client
+        self.exchange = exchange if exchange is not None else self._initialize_exchange(exchange_id)
+        self.limiter = limiter_for(self.exchange)
         self.progress = progress_context
+        self.cache = cache
+        self.offline = offline
+        self.fetch_workers = fetch_workers
+        # Compact mode hands out int64 timestamps and plain price arrays instead of DataFrames
+        self.compact = compact
+        self.price_dtype = np.dtype(price_dtype)
 
     def _initialize_exchange(self, exchange_id):
+        # Requests are paced by the shared token bucket instead of ccxt's own throttle
         try:
             exchange_class = getattr(ccxt, exchange_id)
-            return exchange_class({"enableRateLimit": True})
+            return exchange_class({"enableRateLimit": False})
         except (AttributeError, Exception) as e:
             console.print(
                 f"[yellow]Error initializing exchange {exchange_id}: {e}[/yellow]"
             )
             console.print("[yellow]Falling back to Binance...[/yellow]")
-            return ccxt.binance({"enableRateLimit": True})
+            return ccxt.binance({"enableRateLimit": False})
 
-    def fetch_historical_data(self, symbol, start_date, end_date, task_id=None):
-        timeframe = "1d"
-        data = []
-        current = int(start_date.timestamp() * 1000)
+    def fetch_historical_data(self, symbol, start_date, end_date, task_id=None, timeframe="1d"):
+        start_ts = int(start_date.timestamp() * 1000)
+        end_ts = int(end_date.timestamp() * 1000)
+
+        if self.cache is None:
+            data, _ = self._fetch_range(symbol, timeframe, start_ts, end_ts, task_id)
+            return self._process_ohlcv_data(data, timeframe)
+        return self._fetch_with_cache(symbol, timeframe, start_ts, end_ts, task_id)
+
+    def fetch_historical_chunks(self, symbol, start_date, end_date, task_id=None, timeframe="1d",
+                                chunk_bars=100_000):
+        """Yield the history in time order as DataFrames of at most about ``chunk_bars`` rows.
+
+        Candles are handed out as soon as they are available: cached ones
+        straight from the cache, fetched ones page by page (or segment by
+        segment for long ranges), so a caller can start calculating before
+        the download ends and the full history never exists in memory as a
+        whole. Fetched ranges are still written to the cache. Like the
+        full fetch, the candles are de-duplicated and checked for gaps,
+        across chunk boundaries too.
+        """
+        start_ts = int(start_date.timestamp() * 1000)
+        end_ts = int(end_date.timestamp() * 1000)
+        if self.cache is None:
+            pages = self._iter_range(symbol, timeframe, start_ts, end_ts, task_id)
+        else:
+            pages = self._iter_with_cache(symbol, timeframe, start_ts, end_ts, task_id)
+
+        pending, pending_rows = [], 0
+        previous_ts = last_ts = None
+        for page in pages:
+            if last_ts is not None:
+                # Overlapping segment pages would count a bar twice
+                page = page[page[:, 0] > last_ts]
+            # Cached stretches between fetched ranges can be empty
+            if not len(page):
+                continue
+            pending.append(page)
+            pending_rows += len(page)
+            last_ts = page[-1, 0]
+            if pending_rows >= chunk_bars:
+                yield self._checked_chunk(symbol, timeframe, pending, previous_ts)
+                pending, pending_rows, previous_ts = [], 0, last_ts
+        if pending:
+            yield self._checked_chunk(symbol, timeframe, pending, previous_ts)
+
+    def _checked_chunk(self, symbol, timeframe, pending, previous_ts):
+        """Build one streamed chunk, gap-checked against the end of the chunk before it"""
+        rows = np.concatenate(pending)
+        timestamps = rows[:, 0] if previous_ts is None else np.concatenate([[previous_ts], rows[:, 0]])
+        self._check_gaps(symbol, timeframe, timestamps)
+        return self._process_ohlcv_data(rows, timeframe)
+
+    def fetch_window(self, symbol, start_date, end_date, task_id=None, timeframe="1d"):
+        """Top up the cache and return a zero-copy ``PriceWindow`` of the closed candles.
+
+        Needs a cache with ``window()`` support such as ``MemmapPriceStore``.
+        """
+        start_ts = int(start_date.timestamp() * 1000)
         end_ts = int(end_date.timestamp() * 1000)
+        self._sync_cache(symbol, timeframe, start_ts, end_ts, task_id)
+        return self._cached_window(symbol, timeframe, start_ts, end_ts)
+
+    def _iter_with_cache(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        """Yield cached and freshly fetched candles in time order, caching each fetched range"""
+        cached = self.cache.load(self.exchange.id, symbol, timeframe)
+        last_closed_ts = self._last_closed_ts(timeframe)
+        cursor = start_ts
+
+        for lo, hi in self._ranges_to_fetch(cached, start_ts, end_ts):
+            if cached is not None:
+                yield self._cached_rows(cached, cursor, lo - 1)
+            pages = self._iter_range(symbol, timeframe, lo, hi, task_id)
+            fetched = []
+            try:
+                while True:
+                    try:
+                        page = next(pages)
+                    except StopIteration as stop:
+                        reached_ts = stop.value
+                        break
+                    fetched.append(page)
+                    yield page
+            except (ccxt.NetworkError, ccxt.ExchangeError):
+                if cached is None:
+                    raise
+                self._warn_stale_cache(symbol)
+                # Candles already handed out are not cached, the rest comes from the cache
+                cursor = int(fetched[-1][-1, 0]) + 1 if fetched else lo
+                break
+            rows = np.concatenate(fetched) if fetched else np.empty((0, 6))
+            self._store_fetched(symbol, timeframe, lo, rows, reached_ts, last_closed_ts)
+            cursor = hi + 1
+
+        if cached is not None:
+            yield self._cached_rows(cached, cursor, end_ts)
+
+    @staticmethod
+    def _cached_rows(cached, start_ts, end_ts):
+        timestamps, columns, _ = cached
+        lo_idx = np.searchsorted(timestamps, start_ts, side="left")
+        hi_idx = np.searchsorted(timestamps, end_ts, side="right")
+        return np.column_stack(
+            [timestamps[lo_idx:hi_idx]] + [columns[name][lo_idx:hi_idx] for name in OHLCV_COLUMNS]
+        )
+
+    def _fetch_with_cache(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        fresh = self._sync_cache(symbol, timeframe, start_ts, end_ts, task_id)
+        return self._load_cached_range(symbol, timeframe, start_ts, end_ts, fresh)
+
+    def _sync_cache(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        """Fetch whatever the cache is missing and return the still-forming candles"""
+        cached = self.cache.load(self.exchange.id, symbol, timeframe)
+        last_closed_ts = self._last_closed_ts(timeframe)
+        fresh = []
+
+        for lo, hi in self._ranges_to_fetch(cached, start_ts, end_ts):
+            try:
+                rows, reached_ts = self._fetch_range(symbol, timeframe, lo, hi, task_id)
+            except (ccxt.NetworkError, ccxt.ExchangeError):
+                if cached is None:
+                    raise
+                self._warn_stale_cache(symbol)
+                break
+            fresh.append(self._store_fetched(symbol, timeframe, lo, rows, reached_ts, last_closed_ts))
+
+        return fresh
+
+    def _last_closed_ts(self, timeframe):
+        # Candles that are still forming must never be cached as final
+        return self.exchange.milliseconds() - self.exchange.parse_timeframe(timeframe) * 1000
+
+    def _ranges_to_fetch(self, cached, start_ts, end_ts):
+        if self.offline:
+            return []
+        covered = cached[2] if cached is not None else []
+        return self.cache.missing_ranges(covered, start_ts, end_ts)
+
+    def _warn_stale_cache(self, symbol):
+        console.print(
+            f"[yellow]Could not top up {symbol} from {self.exchange.id}, using cached candles[/yellow]"
+        )
+
+    def _store_fetched(self, symbol, timeframe, lo, rows, reached_ts, last_closed_ts):
+        """Cache the closed candles of a fetched range and return the still-forming ones"""
+        closed = rows[:, 0] <= last_closed_ts
+        fetched_hi = min(reached_ts, last_closed_ts)
+        if closed.any() or fetched_hi >= lo:
+            self.cache.merge(
+                self.exchange.id, symbol, timeframe, rows[closed], (lo, max(fetched_hi, lo - 1))
+            )
+        return rows[~closed]
+
+    def _cached_window(self, symbol, timeframe, start_ts, end_ts):
+        window = self.cache.window(self.exchange.id, symbol, timeframe, start_ts, end_ts)
+        if not len(window):
+            raise ValueError(f"No price data available for {symbol} on {self.exchange.id}")
+        return window
+
+    def _load_cached_range(self, symbol, timeframe, start_ts, end_ts, fresh):
+        cached = self.cache.load(self.exchange.id, symbol, timeframe)
+        fresh = np.concatenate(fresh) if fresh else np.empty((0, 6))
+        if cached is None:
+            if not len(fresh):
+                raise ValueError(f"No price data available for {symbol} on {self.exchange.id}")
+            return self._process_ohlcv_data(fresh, timeframe)
+
+        data = self._cached_rows(cached, start_ts, end_ts)
+        return self._process_ohlcv_data(np.concatenate([data, fresh]), timeframe)
+
+    def _fetch_range(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        """Fetch ``[start_ts, end_ts]`` into one ``(n, 6)`` float64 array.
+
+        Returns the candles and the last timestamp the range is known to be
+        complete up to (``end_ts`` unless an exchange error cut the fetch short).
+        """
+        return self._collect(symbol, timeframe, self._iter_range(symbol, timeframe, start_ts, end_ts, task_id))
+
+    def _iter_range(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        """Yield the candles of ``[start_ts, end_ts]`` in time order.
+
+        Ranges longer than ``SEGMENT_PAGES`` pages are split into segments that
+        are paged through concurrently, sharing the exchange's rate budget;
+        each segment is yielded once it and every earlier one are done. The
+        generator returns the timestamp the range is complete up to.
+        """
+        segments = self._split_range(timeframe, start_ts, end_ts)
+        if len(segments) == 1 or self.fetch_workers <= 1:
+            return (yield from self._iter_pages(symbol, timeframe, start_ts, end_ts, task_id))
+
+        with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+            futures = [
+                executor.submit(self._fetch_segment, symbol, timeframe, lo, hi, task_id) for lo, hi in segments
+            ]
+            try:
+                return (yield from self._join_segments(segments, map(_segment_outcome, futures)))
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _split_range(self, timeframe, start_ts, end_ts):
+        span = SEGMENT_PAGES * PAGE_SIZE * self.exchange.parse_timeframe(timeframe) * 1000
+        return [(lo, min(lo + span - 1, end_ts)) for lo in range(start_ts, end_ts + 1, span)]
+
+    @staticmethod
+    def _join_segments(segments, outcomes):
+        """Yield per-segment candles in order, stopping at the first incomplete segment.
+
+        ``outcomes`` holds ``(rows, reached_ts)`` or the ``ExchangeError`` a
+        segment failed with. Like the serial loop, an error before any candle
+        was fetched is raised, otherwise the range ends where data stops.
+        """
+        fetched = False
+        for (lo, hi), outcome in zip(segments, outcomes):
+            if isinstance(outcome, Exception):
+                if not fetched:
+                    raise outcome
+                # Every segment before this one is complete
+                return lo - 1
+            rows, reached_ts = outcome
+            if len(rows):
+                fetched = True
+                yield rows
+            if reached_ts < hi:
+                return reached_ts
+        return segments[-1][1]
+
+    def _collect(self, symbol, timeframe, pages):
+        """Drain a page generator into one de-duplicated, gap-checked array and its reached timestamp"""
+        data = []
+        while True:
+            try:
+                data.append(next(pages))
+            except StopIteration as stop:
+                reached_ts = stop.value
+                break
+        rows = np.concatenate(data) if data else np.empty((0, 6))
+        if len(data) > 1:
+            _, first = np.unique(rows[:, 0], return_index=True)
+            rows = rows[first]
+            self._check_gaps(symbol, timeframe, rows[:, 0])
+        return rows, reached_ts
+
+    def _check_gaps(self, symbol, timeframe, timestamps):
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        steps = np.diff(timestamps)
+        gaps = steps > timeframe_ms
+        if gaps.any():
+            profiler.count("candle_gaps", int(gaps.sum()))
+            console.print(
+                f"[yellow]{symbol}: {int(gaps.sum())} gap(s) in the {timeframe} candles, "
+                f"longest {int(steps.max() // timeframe_ms) - 1} missing bar(s)[/yellow]"
+            )
+
+    def _fetch_segment(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        data = []
+        pages = self._iter_pages(symbol, timeframe, start_ts, end_ts, task_id)
+        while True:
+            try:
+                data.append(next(pages))
+            except StopIteration as stop:
+                return (np.concatenate(data) if data else np.empty((0, 6))), stop.value
+
+    def _iter_pages(self, symbol, timeframe, start_ts, end_ts, task_id=None):
+        """Page through ``fetch_ohlcv``, yielding each page as a float64 array.
+
+        Pages are converted straight away, so raw OHLCV lists never pile up.
+        The generator returns the timestamp the range is complete up to.
+        """
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        current = start_ts
+        last_ts = None
         retry_count = 0
-        max_retries = 3
-        backoff_time = 30  # Initial backoff time in seconds
 
         while current < end_ts:
             try:
-                if self.progress and task_id:
-                    current_date = datetime.fromtimestamp(current / 1000)
-                    progress_desc = f"[yellow]Fetching {symbol}[/yellow] ([cyan]{current_date.strftime('%Y-%m-%d')}[/cyan])"
-                    self.progress.update(task_id, description=progress_desc)
-
-                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, current, 1000)
+                self._report_progress(symbol, current, task_id)
+                delay = self.limiter.reserve()
+                if delay > 0:
+                    profiler.sleep(delay)
+                with profiler.span("fetch_page", symbol=symbol):
+                    ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, current, PAGE_SIZE)
+                self._count_page(ohlcv)
                 if not ohlcv:
                     break
 
                 # Filter out data points after end_date
-                filtered_ohlcv = [d for d in ohlcv if d[0] <= end_ts]
-                data.extend(filtered_ohlcv)
+                page = np.asarray(ohlcv, dtype=np.float64)
+                page = page[page[:, 0] <= end_ts]
+                if len(page):
+                    last_ts = int(page[-1, 0])
+                    yield page
 
-                if not filtered_ohlcv or filtered_ohlcv[-1][0] >= end_ts:
+                if not len(page) or last_ts >= end_ts:
                     break
 
-                current = ohlcv[-1][0] + 86400000  # Move to next day
-                time.sleep(self.exchange.rateLimit / 1000)
+                current = ohlcv[-1][0] + timeframe_ms  # Move to the next bar
                 retry_count = 0  # Reset retry count on successful request
-                
-            except ccxt.RateLimitExceeded:
-                if retry_count < max_retries:
-                    retry_count += 1
-                    wait_time = backoff_time * (2 ** (retry_count - 1))  # Exponential backoff
-                    if self.progress and task_id:
-                        self.progress.update(
-                            task_id,
-                            description=f"[yellow]Rate limit reached for {symbol}, waiting {wait_time}s (Attempt {retry_count}/{max_retries})[/yellow]"
-                        )
-                    time.sleep(wait_time)
-                else:
-                    console.print(Panel(
-                        f"[red]Maximum retries reached for {symbol}[/red]\n"
-                        "[yellow]The exchange rate limit was reached too many times.[/yellow]\n"
-                        "Try again later or use a different exchange.",
-                        title="⚠️ Rate Limit Error",
-                        border_style="red"
-                    ))
-                    raise
-                    
-            except ccxt.NetworkError as e:
-                if retry_count < max_retries:
-                    retry_count += 1
-                    wait_time = backoff_time * (2 ** (retry_count - 1))
-                    if self.progress and task_id:
-                        self.progress.update(
-                            task_id,
-                            description=f"[yellow]Network error for {symbol}, retrying in {wait_time}s (Attempt {retry_count}/{max_retries})[/yellow]"
-                        )
-                    time.sleep(wait_time)
-                else:
-                    console.print(Panel(
-                        f"[red]Network error while fetching {symbol}: {str(e)}[/red]\n"
-                        "[yellow]Please check your internet connection and try again.[/yellow]",
-                        title="❌ Network Error",
-                        border_style="red"
-                    ))
-                    raise
-                    
+
+            except ccxt.NetworkError as e:  # Also covers RateLimitExceeded
+                retry_count += 1
+                profiler.sleep(self._retry_delay(e, symbol, retry_count, task_id), "retry_backoff")
+
             except ccxt.ExchangeError as e:
+                self._report_exchange_error(e, symbol)
+                if last_ts is None:  # Only raise if we haven't fetched any data yet
+                    raise
+                return last_ts
+
+        return end_ts
+
+    def _count_page(self, ohlcv):
+        profiler.count("pages_fetched")
+        profiler.count("candles_fetched", len(ohlcv))
+
+    def _report_progress(self, symbol, current, task_id=None):
+        if self.progress and task_id:
+            current_date = datetime.fromtimestamp(current / 1000)
+            progress_desc = f"[yellow]Fetching {symbol}[/yellow] ([cyan]{current_date.strftime('%Y-%m-%d')}[/cyan])"
+            self.progress.update(task_id, description=progress_desc)
+
+    def _retry_delay(self, error, symbol, retry_count, task_id=None):
+        """Return the backoff before the next attempt, re-raising once retries run out.
+
+        Rate-limit errors wait at least as long as the exchange's
+        ``Retry-After`` header asks and pause the shared token bucket, so
+        other fetches on the same exchange hold off too.
+        """
+        max_retries = MAX_RETRIES
+        rate_limited = isinstance(error, ccxt.RateLimitExceeded)
+        profiler.count("rate_limit_retries" if rate_limited else "network_retries")
+
+        if retry_count > max_retries:
+            if rate_limited:
                 console.print(Panel(
-                    f"[red]Exchange error while fetching {symbol}: {str(e)}[/red]\n"
-                    "[yellow]The exchange might be having issues with this trading pair.[/yellow]",
-                    title="❌ Exchange Error",
+                    f"[red]Maximum retries reached for {symbol}[/red]\n"
+                    "[yellow]The exchange rate limit was reached too many times.[/yellow]\n"
+                    "Try again later or use a different exchange.",
+                    title="⚠️ Rate Limit Error",
                     border_style="red"
                 ))
-                if not data:  # Only raise if we haven't fetched any data yet
-                    raise
-                break
+            else:
+                console.print(Panel(
+                    f"[red]Network error while fetching {symbol}: {str(error)}[/red]\n"
+                    "[yellow]Please check your internet connection and try again.[/yellow]",
+                    title="❌ Network Error",
+                    border_style="red"
+                ))
+            raise error
 
-        return self._process_ohlcv_data(data)
+        wait_time = backoff_delay(retry_count)
+        if rate_limited:
+            retry_after = retry_after_seconds(getattr(self.exchange, "last_response_headers", None))
+            if retry_after is not None:
+                wait_time = max(wait_time, retry_after)
+            self.limiter.pause(wait_time)
+        if self.progress and task_id:
+            if rate_limited:
+                description = f"[yellow]Rate limit reached for {symbol}, waiting {wait_time:.1f}s (Attempt {retry_count}/{max_retries})[/yellow]"
+            else:
+                description = f"[yellow]Network error for {symbol}, retrying in {wait_time:.1f}s (Attempt {retry_count}/{max_retries})[/yellow]"
+            self.progress.update(task_id, description=description)
+        return wait_time
 
-    def _process_ohlcv_data(self, data):
-        df = pd.DataFrame(
-            data, columns=["Start", "Open", "High", "Low", "Close", "Volume"]
-        )
-        df["Start"] = pd.to_datetime(df["Start"], unit="ms")
-        df = df[
-            df["Start"] <= pd.Timestamp(df["Start"].iloc[-1].date())
-        ]  # Ensure we only include full days
+    def _report_exchange_error(self, error, symbol):
+        console.print(Panel(
+            f"[red]Exchange error while fetching {symbol}: {str(error)}[/red]\n"
+            "[yellow]The exchange might be having issues with this trading pair.[/yellow]",
+            title="❌ Exchange Error",
+            border_style="red"
+        ))
+
+    def _process_ohlcv_data(self, data, timeframe="1d"):
+        with profiler.span("process_ohlcv"):
+            profiler.count("bars_processed", len(data))
+            data = np.asarray(data, dtype=np.float64).reshape(-1, 6)
+            if self.compact:
+                return self._build_window(data, timeframe)
+            return self._build_frame(data, timeframe)
+
+    def _build_frame(self, data, timeframe="1d"):
+        df = pd.DataFrame(data[:, 1:].astype(self.price_dtype, copy=False), columns=OHLCV_COLUMNS)
+        df.insert(0, "Start", pd.to_datetime(data[:, 0].astype(np.int64), unit="ms"))
+        if timeframe == "1d" and len(df):
+            df = df[
+                df["Start"] <= pd.Timestamp(df["Start"].iloc[-1].date())
+            ]  # Ensure we only include full days
         return df.sort_values("Start").drop_duplicates(subset=["Start"])
+
+    def _build_window(self, data, timeframe="1d"):
+        """Same rows as ``_build_frame``, as a ``PriceWindow`` of int64 timestamps and price arrays"""
+        timestamps = data[:, 0].astype(np.int64)
+        keep = np.ones(len(data), dtype=bool)
+        if timeframe == "1d" and len(data):
+            keep = timestamps <= timestamps[-1] // MS_PER_DAY * MS_PER_DAY  # Ensure we only include full days
+        order = np.argsort(timestamps[keep], kind="stable")
+        rows = data[keep][order]
+        timestamps = timestamps[keep][order]
+        first = np.ones(len(timestamps), dtype=bool)
+        first[1:] = timestamps[1:] != timestamps[:-1]
+        return PriceWindow(
+            timestamps[first],
+            {name: rows[first, i + 1].astype(self.price_dtype) for i, name in enumerate(OHLCV_COLUMNS)},
+        )
+
+
+def _segment_outcome(future):
+    """``(rows, reached_ts)`` of a finished segment, or the ``ExchangeError`` it failed with"""
+    try:
+        return future.result()
+    except ccxt.ExchangeError as e:
+        return e
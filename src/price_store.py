@@ -0,0 +1,136 @@
+import os
+import shutil
+import numpy as np
+from .price_cache import OHLCV_COLUMNS, OHLCVCache, _merge_ranges
+from .profiling import profiler
+
+# File name and on-disk dtype of every column
+STORE_COLUMNS = [("timestamps", np.int64)] + [(name, np.float64) for name in OHLCV_COLUMNS]
+
+
+class PriceWindow:
+    """Read-only view of one symbol's candles over a time range.
+
+    Timestamps are int64 epoch milliseconds. For ``MemmapPriceStore`` the
+    columns are slices of the memory-mapped files, so nothing is read from
+    disk until a value is used; a compact ``PriceDataFetcher`` fills them
+    with in-memory arrays instead. Item access mirrors the DataFrame
+    returned by ``PriceDataFetcher`` (``window["Close"]``, ``window["Start"]``)
+    closely enough for ``DCACalculator`` to consume it directly.
+    """
+
+    def __init__(self, timestamps, columns):
+        self.timestamps = timestamps
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, name):
+        if name == "Start":
+            return self.timestamps.view("datetime64[ms]")
+        return self.columns[name]
+
+    def to_frame(self):
+        """Copy the window into a regular DataFrame"""
+        import pandas as pd
+
+        df = pd.DataFrame({name: np.array(self.columns[name]) for name in OHLCV_COLUMNS})
+        df.insert(0, "Start", pd.to_datetime(np.array(self.timestamps), unit="ms"))
+        return df
+
+
+class MemmapPriceStore(OHLCVCache):
+    """Price cache that keeps every column as a flat binary file opened with ``numpy.memmap``.
+
+    Each (exchange, symbol, timeframe) is a directory holding one raw array
+    per column plus ``covered.npy``. Loading only maps the files, so a few
+    hundred hourly histories can be opened without reading them into RAM,
+    and ``window()`` hands out zero-copy slices for a date range. Topping up
+    the tail appends to the files in place; anything else falls back to a
+    full rewrite into a fresh directory that is swapped in afterwards.
+    """
+
+    def _path(self, exchange_id, symbol, timeframe):
+        return os.path.splitext(super()._path(exchange_id, symbol, timeframe))[0]
+
+    @staticmethod
+    def _open(path, name, dtype):
+        file = os.path.join(path, f"{name}.bin")
+        rows = os.path.getsize(file) // np.dtype(dtype).itemsize
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(file, dtype=dtype, mode="r", shape=(rows,))
+
+    def load(self, exchange_id, symbol, timeframe):
+        """Return memory-mapped ``(timestamps, columns, covered)`` or ``None`` if nothing is stored"""
+        path = self._path(exchange_id, symbol, timeframe)
+        if not os.path.exists(os.path.join(path, "covered.npy")):
+            return None
+        with profiler.span("cache_load", symbol=symbol):
+            arrays = {name: self._open(path, name, dtype) for name, dtype in STORE_COLUMNS}
+            covered = np.load(os.path.join(path, "covered.npy"))
+        # An interrupted append can leave some files a page longer than others
+        rows = min(len(values) for values in arrays.values())
+        timestamps = arrays.pop("timestamps")[:rows]
+        return timestamps, {name: values[:rows] for name, values in arrays.items()}, covered
+
+    def window(self, exchange_id, symbol, timeframe, start_ts, end_ts):
+        """Zero-copy ``PriceWindow`` over the stored candles in ``[start_ts, end_ts]``"""
+        cached = self.load(exchange_id, symbol, timeframe)
+        if cached is None:
+            return PriceWindow(np.empty(0, dtype=np.int64), {name: np.empty(0) for name in OHLCV_COLUMNS})
+        timestamps, columns, _ = cached
+        lo_idx = np.searchsorted(timestamps, start_ts, side="left")
+        hi_idx = np.searchsorted(timestamps, end_ts, side="right")
+        return PriceWindow(
+            timestamps[lo_idx:hi_idx], {name: values[lo_idx:hi_idx] for name, values in columns.items()}
+        )
+
+    def store(self, exchange_id, symbol, timeframe, timestamps, columns, covered):
+        path = self._path(exchange_id, symbol, timeframe)
+        tmp_path, old_path = path + ".tmp", path + ".old"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        arrays = dict(columns, timestamps=timestamps)
+        with profiler.span("cache_store", symbol=symbol):
+            for name, dtype in STORE_COLUMNS:
+                self._write_column(tmp_path, name, np.asarray(arrays[name], dtype=dtype), "wb")
+            self._write_covered(tmp_path, covered)
+        if os.path.exists(path):
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def merge(self, exchange_id, symbol, timeframe, rows, fetched_range):
+        """Merge fetched ``rows``, appending in place when they all come after the stored tail"""
+        cached = self.load(exchange_id, symbol, timeframe)
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+        rows = rows[np.argsort(rows[:, 0], kind="stable")]
+        if cached is None or (len(rows) and len(cached[0]) and rows[0, 0] <= cached[0][-1]):
+            super().merge(exchange_id, symbol, timeframe, rows, fetched_range)
+            return
+
+        timestamps, _, covered = cached
+        path = self._path(exchange_id, symbol, timeframe)
+        new_columns = [rows[:, 0]] + [rows[:, i + 1] for i in range(len(OHLCV_COLUMNS))]
+        with profiler.span("cache_store", symbol=symbol):
+            for (name, dtype), values in zip(STORE_COLUMNS, new_columns):
+                self._write_column(path, name, values.astype(dtype), "r+b", keep_rows=len(timestamps))
+            self._write_covered(path, np.concatenate([covered, np.asarray([fetched_range], dtype=np.int64)]))
+
+    @staticmethod
+    def _write_column(path, name, values, mode, keep_rows=0):
+        with open(os.path.join(path, f"{name}.bin"), mode) as f:
+            # Drop any partial tail from an interrupted append before writing
+            f.truncate(keep_rows * values.itemsize)
+            f.seek(0, os.SEEK_END)
+            values.tofile(f)
+        profiler.count("cache_bytes_written", values.nbytes)
+
+    @staticmethod
+    def _write_covered(path, covered):
+        # covered.npy is replaced last, it is what marks the new rows as usable
+        tmp_file = os.path.join(path, "covered.tmp.npy")
+        np.save(tmp_file, np.asarray(_merge_ranges(covered), dtype=np.int64).reshape(-1, 2))
+        os.replace(tmp_file, os.path.join(path, "covered.npy"))
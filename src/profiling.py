@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Profiler:
+    """Lightweight recorder of timing spans and counters.
+
+    Instrumented code calls ``profiler.span(name)`` around a stage and
+    ``profiler.count(name, amount)`` for things like pages fetched or bytes
+    written. While disabled both are near no-ops, so the hooks can stay in
+    the hot paths permanently. Spans keep their start offset and thread so
+    they can be exported as a Chrome trace.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.counters = defaultdict(float)
+
+    def enable(self):
+        self.reset()
+        self.enabled = True
+
+    @contextmanager
+    def span(self, name, **args):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "start": started - self.origin,
+                    "duration": ended - started,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args,
+                })
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += amount
+
+    def sleep(self, seconds, name="rate_limit_sleep"):
+        """``time.sleep`` that books the time slept under ``name``"""
+        self.count(f"{name}_seconds", seconds)
+        with self.span(name):
+            time.sleep(seconds)
+
+    def summary(self):
+        """Total time, call count and share of the run per span name"""
+        totals = defaultdict(lambda: {"calls": 0, "seconds": 0.0})
+        for span in self.spans:
+            totals[span["name"]]["calls"] += 1
+            totals[span["name"]]["seconds"] += span["duration"]
+        wall = time.perf_counter() - self.origin
+        for stats in totals.values():
+            stats["share"] = stats["seconds"] / wall if wall > 0 else 0.0
+        return dict(sorted(totals.items(), key=lambda item: -item[1]["seconds"])), wall
+
+    def to_chrome_trace(self):
+        events = [
+            {
+                "name": span["name"],
+                "ph": "X",
+                "ts": span["start"] * 1e6,
+                "dur": span["duration"] * 1e6,
+                "pid": span["pid"],
+                "tid": span["tid"],
+                "args": span["args"],
+            }
+            for span in self.spans
+        ]
+        events.extend(
+            {"name": name, "ph": "C", "ts": 0, "pid": os.getpid(), "args": {name: value}}
+            for name, value in self.counters.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Write a Chrome trace (``.trace.json``) or a plain JSON summary (any other name)"""
+        if path.endswith(".trace.json"):
+            payload = self.to_chrome_trace()
+        else:
+            spans, wall = self.summary()
+            payload = {"wall_seconds": wall, "spans": spans, "counters": dict(self.counters)}
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=2)
+
+    def print_report(self, console):
+        from rich.table import Table
+        from rich import box
+
+        spans, wall = self.summary()
+        table = Table(title="⏱ Profile Breakdown", box=box.ROUNDED, header_style="bold cyan")
+        table.add_column("Stage", style="cyan")
+        table.add_column("Calls", justify="right")
+        table.add_column("Time", justify="right")
+        table.add_column("Share", justify="right")
+        for name, stats in spans.items():
+            table.add_row(name, str(stats["calls"]), f"{stats['seconds']:.3f}s", f"{stats['share'] * 100:.1f}%")
+        table.add_row("[bold]wall clock[/bold]", "", f"[bold]{wall:.3f}s[/bold]", "")
+
+        counters = Table(title="📊 Counters", box=box.ROUNDED, header_style="bold cyan")
+        counters.add_column("Counter", style="cyan")
+        counters.add_column("Value", justify="right")
+        for name, value in sorted(self.counters.items()):
+            counters.add_row(name, f"{value:,.3f}" if name.endswith("seconds") else f"{value:,.0f}")
+
+        console.print(table)
+        console.print(counters)
+
+
+profiler = Profiler()
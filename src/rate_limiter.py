@@ -0,0 +1,85 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Requests an idle client may fire back to back before pacing kicks in
+RATE_LIMIT_BURST = 5
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_jitter = random.Random()
+
+
+class TokenBucket:
+    """Request budget refilled at ``rate`` tokens per second up to ``capacity``.
+
+    ``reserve()`` takes a token and returns how long the caller has to wait
+    before using it, which is zero while the budget lasts. Tokens can go
+    negative, so concurrent callers queue up behind each other instead of
+    all waking at once. ``pause()`` stops the refill for a while, e.g. when
+    the exchange asked us to back off.
+    """
+
+    def __init__(self, rate, capacity=RATE_LIMIT_BURST, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, cost=1):
+        with self._lock:
+            now = self.clock()
+            if now > self.updated:
+                if self.rate:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                else:
+                    self.tokens = self.capacity
+                self.updated = now
+            self.tokens -= cost
+            # updated lies in the future while paused, refill resumes from there
+            wait = self.updated - now
+            if self.tokens < 0 and self.rate:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def pause(self, seconds):
+        with self._lock:
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, self.clock() + seconds)
+
+
+def limiter_for(exchange):
+    """The ``TokenBucket`` shared by every fetcher talking to ``exchange``"""
+    rate_limit = getattr(exchange, "rateLimit", 0) or 0
+    key = (exchange.id, rate_limit)
+    with _limiters_lock:
+        if key not in _limiters:
+            # ccxt's rateLimit is the minimum number of milliseconds between requests
+            _limiters[key] = TokenBucket(1000 / rate_limit if rate_limit else 0)
+        return _limiters[key]
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """Exponential backoff with jitter: half the step is fixed, half random"""
+    step = min(cap, base * 2 ** (attempt - 1))
+    return step / 2 + _jitter.uniform(0, step / 2)
+
+
+def retry_after_seconds(headers):
+    """Seconds from a ``Retry-After`` header (delay or HTTP date), or ``None``"""
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
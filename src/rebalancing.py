@@ -0,0 +1,188 @@
+import numpy as np
+from .calculator import parse_buy_period_seconds
+from .portfolio import PortfolioAggregate
+from .profiling import profiler
+
+
+class RebalancedPortfolio(PortfolioAggregate):
+    """The multi-pair DCA portfolio, periodically traded back to its target weights.
+
+    Each pair keeps its own DCA contributions, but the holdings are simulated
+    as one ``pairs x time`` units matrix and reset to the allocation weights
+    on a calendar (``every``, a buy-period string such as ``"1w"`` or
+    ``"3m"``), whenever any weight drifts more than ``threshold`` (a
+    fraction, e.g. ``0.05``) from its target, or both. Pairs that are not
+    listed yet get no weight. ``fee`` is charged on the traded notional and
+    taken out of the portfolio.
+
+    Holdings are advanced ``BLOCK`` bars at a time with one cumulative sum
+    over all pairs. After a rebalance the rest of the block is that same sum
+    shifted by the new holdings, and the next trigger is searched in doubling
+    windows, so the work stays proportional to bars x pairs however often the
+    rule fires. The loop only steps from one rebalance to the next, never
+    over pairs. All ``PortfolioAggregate`` metrics then describe the
+    rebalanced portfolio. ``rebalance_indices``, ``trades``
+    (notional per pair and rebalance, positive = buy) and ``turnover`` record
+    what was traded.
+    """
+
+    BLOCK = 256
+
+    def __init__(self, all_results, every=None, threshold=None, fee=0.0):
+        if every is None and threshold is None:
+            raise ValueError("Rebalancing needs a calendar period, a drift threshold or both")
+        self.every = every
+        self.threshold = threshold
+        self.fee = fee
+        super().__init__(all_results)
+
+    def _align(self, results):
+        super()._align(results)
+        self.prices = np.zeros_like(self.values)
+        for row, r in enumerate(results):
+            idx = np.searchsorted(r.timestamps, self.timestamps, side="right") - 1
+            listed = idx >= 0
+            self.prices[row, listed] = r.prices[idx[listed]]
+        with profiler.span("rebalance_simulation", pairs=len(results), bars=len(self.timestamps)):
+            self._simulate()
+
+    def _target_weights(self, prices):
+        """Allocation weights renormalized over the pairs with a price, for one bar or a block of bars"""
+        allocations = self.allocations.reshape((-1,) + (1,) * (prices.ndim - 1))
+        weights = np.where(prices > 0, allocations, 0.0)
+        totals = weights.sum(axis=0)
+        return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+    def _calendar(self):
+        if self.every is None:
+            return None
+        period_ms = parse_buy_period_seconds(self.every) * 1000
+        buckets = self.timestamps // period_ms
+        calendar = np.zeros(len(buckets), dtype=bool)
+        calendar[1:] = buckets[1:] != buckets[:-1]
+        return calendar
+
+    def _next_calendar_bars(self):
+        """Index of the first calendar rebalance at or after every bar, ``len(timestamps)`` past the last one"""
+        calendar = self._calendar()
+        if calendar is None:
+            return None
+        hits = np.flatnonzero(calendar)
+        return np.append(hits, len(calendar))[np.searchsorted(hits, np.arange(len(calendar)))]
+
+    def _simulate(self):
+        # Time-major copies, so the holdings of one bar are one contiguous row
+        prices = np.ascontiguousarray(self.prices.T)
+        targets = np.ascontiguousarray(self._target_weights(self.prices).T)
+        # Unlisted pairs have no price and a zero target, so they never buy or get units
+        inverse_prices = np.divide(1.0, prices, out=np.zeros_like(prices), where=prices > 0)
+        bought = np.diff(self.costs, axis=1, prepend=0.0).T * inverse_prices
+        next_calendar = self._next_calendar_bars()
+        units = np.empty_like(prices)
+        state = np.zeros(len(self.pairs))
+        events, trades = [], []
+        self.fees_paid = 0.0
+
+        for start in range(0, len(prices), self.BLOCK):
+            stop = min(len(prices), start + self.BLOCK)
+            # Holdings at bar k of the block are offset + growth[k - start]
+            growth = np.cumsum(bought[start:stop], axis=0)
+            offset = state
+            pos = start
+            while pos < stop:
+                t = self._next_trigger(prices, targets, next_calendar, offset, growth, start, pos, stop)
+                hold_until = stop if t is None else t
+                units[pos:hold_until] = offset + growth[pos - start:hold_until - start]
+                if t is None:
+                    break
+
+                # Rebalance after the contributions of the triggering bar, then carry on from the next one
+                state = offset + growth[t - start]
+                values = state * prices[t]
+                total = values.sum()
+                if total > 0:
+                    fee = self.fee * np.abs(targets[t] * total - values).sum()
+                    target_values = (total - fee) * targets[t]
+                    state = target_values * inverse_prices[t]
+                    self.fees_paid += fee
+                    events.append(t)
+                    trades.append(target_values - values)
+                units[t] = state
+                # The rest of the block is the same cumulative sum, shifted onto the new holdings
+                offset = state - growth[t - start]
+                pos = t + 1
+            state = offset + growth[-1]
+
+        self.units = np.ascontiguousarray(units.T)
+        self.values = self.units * self.prices
+        self.rebalance_indices = np.array(events, dtype=np.int64)
+        self.trades = np.array(trades).T if trades else np.zeros((len(self.pairs), 0))
+        pre_trade_totals = self.values[:, self.rebalance_indices].sum(axis=0) - self.trades.sum(axis=0)
+        self.turnover = np.divide(
+            np.abs(self.trades).sum(axis=0) / 2, pre_trade_totals,
+            out=np.zeros(len(events)), where=pre_trade_totals > 0
+        )
+
+    def _next_trigger(self, prices, targets, next_calendar, offset, growth, start, pos, stop):
+        """First bar in ``[pos, stop)`` where the rule fires, or ``None``.
+
+        The next calendar bar is looked up directly. Drift is only checked
+        before it, in windows of 1, 2, 4, ... bars, so a search costs about
+        as much as the bars it moves past.
+        """
+        calendar_bar = stop if next_calendar is None else next_calendar[pos]
+        end = min(stop, calendar_bar)
+        width = 1
+        while self.threshold is not None and pos < end:
+            hi = min(end, pos + width)
+            values = (offset + growth[pos - start:hi - start]) * prices[pos:hi]
+            totals = values.sum(axis=1, keepdims=True)
+            weights = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+            drift = np.abs(weights - targets[pos:hi]).max(axis=1)
+            hits = np.flatnonzero((drift > self.threshold) & (totals[:, 0] > 0))
+            if len(hits):
+                return pos + hits[0]
+            pos, width = hi, width * 2
+        return calendar_bar if calendar_bar < stop else None
+
+    @property
+    def rebalance_dates(self):
+        return self.dates[self.rebalance_indices]
+
+    @property
+    def drift(self):
+        """Largest distance of any pair's weight from its target at every bar"""
+        return np.abs(self.weights - self._target_weights(self.prices)).max(axis=0)
+
+    def print_summary(self, console, baseline, title="⚖️ Rebalancing"):
+        """Compare with ``baseline``, the same portfolio left to drift"""
+        from rich.table import Table
+        from rich import box
+
+        table = Table(title=title, box=box.ROUNDED, header_style="bold cyan")
+        table.add_column("Portfolio", style="cyan")
+        table.add_column("Value", justify="right")
+        table.add_column("P/L %", justify="right")
+        table.add_column("Max Drawdown", justify="right")
+        table.add_column("Volatility", justify="right")
+        table.add_column("Sharpe", justify="right")
+        rule = " + ".join(filter(None, [
+            f"every {self.every}" if self.every else None,
+            f"drift > {self.threshold * 100:g}%" if self.threshold is not None else None,
+        ]))
+        for name, portfolio in (("Buy & hold", baseline), (f"Rebalanced ({rule})", self)):
+            pnl = portfolio.pnl_percentages[-1]
+            color = "green" if pnl >= 0 else "red"
+            table.add_row(
+                name,
+                f"${portfolio.current_value:,.2f}",
+                f"[{color}]{pnl:+.2f}%[/{color}]",
+                f"{portfolio.max_drawdown:.2f}%",
+                f"{portfolio.volatility:.1f}%",
+                f"{portfolio.sharpe_ratio:.2f}",
+            )
+        table.caption = (
+            f"{len(self.rebalance_indices):,} rebalances, {self.turnover.sum() * 100:.1f}% total turnover, "
+            f"${self.fees_paid:,.2f} fees"
+        )
+        console.print(table)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+
+class DCAResult:
+    """Array-backed result of a DCA calculation.
+
+    Time series are kept as float64 NumPy arrays (``prices`` may also be
+    float32) next to an int64 array of millisecond epoch timestamps; readable
+    dates are only built when ``dates`` is used. The summary metrics are plain
+    attributes. Item access (``result["prices"]``, ``result.get(...)``,
+    ``"values" in result``) mirrors the dict the calculator used to return,
+    and ``to_dict()`` rebuilds that dict with Python lists when needed.
+    """
+
+    SERIES = ("prices", "dca_prices", "pnl_percentages", "values", "costs")
+    METRICS = (
+        "total_invested", "total_crypto", "highest_price", "lowest_price", "avg_price",
+        "cost_basis", "current_value", "fear_index", "negative_pnl_days", "total_days",
+        "max_drawdown", "volatility", "sharpe_ratio",
+    )
+    __slots__ = ("timestamps", "best_index", "worst_index", "timeframe", "_dates", "_rolling") + SERIES + METRICS
+
+    def __init__(self, timestamps, best_index, worst_index, timeframe="1d", **fields):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.best_index = int(best_index)
+        self.worst_index = int(worst_index)
+        self.timeframe = timeframe
+        self._dates = None
+        self._rolling = None
+        for name in self.SERIES:
+            values = np.asarray(fields[name])
+            if not (name == "prices" and values.dtype == np.float32):
+                values = values.astype(np.float64, copy=False)
+            setattr(self, name, values)
+        for name in self.METRICS:
+            setattr(self, name, fields[name])
+
+    @property
+    def dates(self):
+        """Timestamps as a ``DatetimeIndex``, built on first access"""
+        if self._dates is None:
+            self._dates = pd.to_datetime(self.timestamps, unit="ms")
+        return self._dates
+
+    @property
+    def rolling(self):
+        """30/90/365-day ``RollingMetrics``, computed on first access"""
+        if self._rolling is None:
+            from .rolling_metrics import RollingMetrics
+
+            self._rolling = RollingMetrics(self.timestamps, self.prices, self.values, self.timeframe)
+        return self._rolling
+
+    @property
+    def best_day(self):
+        return self.prices[self.best_index], self.dates[self.best_index]
+
+    @property
+    def worst_day(self):
+        return self.prices[self.worst_index], self.dates[self.worst_index]
+
+    def keys(self):
+        return ("dates",) + self.SERIES + self.METRICS + ("best_day", "worst_day")
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def to_dict(self):
+        """Legacy dict with the time series as Python lists"""
+        result = {key: self[key] for key in self.keys()}
+        result["dates"] = self.dates.tolist()
+        for name in self.SERIES:
+            result[name] = result[name].tolist()
+        return result
@@ -0,0 +1,109 @@
+import numpy as np
+from .calculator import SECONDS_PER_DAY, periods_per_year, timeframe_seconds
+from .profiling import profiler
+
+ROLLING_WINDOWS = (30, 90, 365)
+
+
+def window_sums(x, window):
+    """Sum of every ``window`` consecutive values, from one cumulative sum"""
+    sums = np.concatenate([[0.0], np.cumsum(x)])
+    return sums[window:] - sums[:-window]
+
+
+def rolling_max(x, window):
+    """Trailing maximum over ``window`` values, NaN until the first full window.
+
+    Uses the van Herk/Gil-Werman scheme: the series is cut into blocks of
+    ``window`` values and every window is the max of one block suffix and
+    the next block's prefix, so the cost does not depend on the window size.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    padded = np.concatenate([x, np.full(-n % window, -np.inf)]).reshape(-1, window)
+    prefix = np.maximum.accumulate(padded, axis=1).ravel()
+    suffix = np.maximum.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+class RollingMetrics:
+    """Trailing volatility, Sharpe ratio and drawdown of one pair, per window.
+
+    ``windows`` are in days and converted to bars of ``timeframe``. Each
+    metric is a dict from window to an array aligned with ``timestamps``,
+    NaN until the window is full. Volatility and Sharpe ratio use bar-to-bar
+    price returns like ``DCACalculator``'s full-period figures; drawdown is
+    the position value against its peak within the window, in percent.
+    Everything comes from cumulative sums and block maxima, in O(n) per window.
+    """
+
+    RISK_FREE_RATE = 0.02
+
+    def __init__(self, timestamps, prices, values, timeframe="1d", windows=ROLLING_WINDOWS):
+        self.timestamps = timestamps
+        self.timeframe = timeframe
+        self.windows = tuple(windows)
+        self.periods_per_year = periods_per_year(timeframe)
+        prices = np.asarray(prices, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        returns = np.diff(prices) / prices[:-1]
+        self.volatility, self.sharpe_ratio, self.drawdown = {}, {}, {}
+        with profiler.span("rolling_metrics", bars=len(prices), windows=len(self.windows)):
+            for days in self.windows:
+                bars = self.window_bars(days)
+                self.volatility[days], self.sharpe_ratio[days] = self._return_stats(returns, bars)
+                self.drawdown[days] = self._drawdown(values, bars)
+
+    def window_bars(self, days):
+        return max(2, days * SECONDS_PER_DAY // timeframe_seconds(self.timeframe))
+
+    def _return_stats(self, returns, bars):
+        volatility = np.full(len(returns) + 1, np.nan)
+        sharpe = np.full_like(volatility, np.nan)
+        if bars > len(returns):
+            return volatility, sharpe
+        # Centering first keeps the sum-of-squares difference from cancelling out
+        center = returns.mean()
+        centered = returns - center
+        means = window_sums(centered, bars) / bars
+        stds = np.sqrt(np.maximum(window_sums(centered ** 2, bars) / bars - means ** 2, 0.0))
+        # The window ending at bar i holds the returns into bars i-bars+1 .. i
+        volatility[bars:] = stds * np.sqrt(self.periods_per_year) * 100
+        excess = means + center - self.RISK_FREE_RATE / self.periods_per_year
+        np.divide(np.sqrt(self.periods_per_year) * excess, stds, out=sharpe[bars:], where=stds > 0)
+        return volatility, sharpe
+
+    @staticmethod
+    def _drawdown(values, bars):
+        peaks = rolling_max(values, bars)
+        drawdown = np.full_like(peaks, np.nan)
+        full = ~np.isnan(peaks)
+        drawdown[full] = 0.0
+        held = full & (peaks > 0)
+        drawdown[held] = (values[held] - peaks[held]) / peaks[held] * 100
+        return drawdown
+
+    def latest(self):
+        """Last value of every metric, as ``{window: {metric: value}}``"""
+        return {
+            days: {
+                "volatility": self.volatility[days][-1],
+                "sharpe_ratio": self.sharpe_ratio[days][-1],
+                "drawdown": self.drawdown[days][-1],
+            }
+            for days in self.windows
+        }
+
+    def to_frame(self):
+        """All series as one DataFrame indexed by date, e.g. a ``volatility_30d`` column"""
+        import pandas as pd
+
+        columns = {}
+        for days in self.windows:
+            columns[f"volatility_{days}d"] = self.volatility[days]
+            columns[f"sharpe_ratio_{days}d"] = self.sharpe_ratio[days]
+            columns[f"drawdown_{days}d"] = self.drawdown[days]
+        return pd.DataFrame(columns, index=pd.to_datetime(self.timestamps, unit="ms"))
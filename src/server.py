@@ -0,0 +1,283 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import ccxt
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from .calculator import DCACalculator, timeframe_seconds
+from .portfolio import PortfolioAggregate
+from .price_fetcher import PriceDataFetcher
+
+console = Console()
+
+SUMMARY_FIELDS = (
+    "total_invested", "total_crypto", "cost_basis", "current_value", "highest_price", "lowest_price",
+    "fear_index", "negative_pnl_days", "total_days", "max_drawdown", "volatility", "sharpe_ratio",
+)
+SERIES_FIELDS = ("prices", "dca_prices", "pnl_percentages", "values", "costs")
+
+
+class LRUCache:
+    """Size-bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"entries": len(self), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+class DCAService:
+    """Multi-pair DCA calculation kept warm between requests.
+
+    One fetcher (and so one exchange client) is kept per exchange, and the
+    candles loaded for each (exchange, pair, timeframe) stay in memory along
+    with the range they cover. A request inside that range is a slice; one
+    reaching further only fetches the candles after the last one held.
+    Calculator results are memoized in an ``LRUCache`` keyed by exchange,
+    pair, date range, buy period, timeframe and amount. Requests without an
+    end date end at the last closed bar, so they never include a candle that
+    is still forming and share cache entries until the next candle opens.
+    """
+
+    def __init__(self, cache=None, offline=False, max_entries=256, exchanges=None):
+        self.cache = cache
+        self.offline = offline
+        self.results = LRUCache(max_entries)
+        self._exchanges = exchanges or {}
+        self._fetchers = {}
+        self._prices = {}
+        # Fetches are serialized so concurrent requests never load the same series twice
+        self._fetch_lock = threading.Lock()
+
+    def _fetcher(self, exchange_id):
+        # Only called with _fetch_lock held, so each exchange gets exactly one client
+        if exchange_id not in self._fetchers:
+            self._fetchers[exchange_id] = PriceDataFetcher(
+                exchange_id, cache=self.cache, offline=self.offline, exchange=self._exchanges.get(exchange_id)
+            )
+        return self._fetchers[exchange_id]
+
+    def _price_data(self, exchange_id, pair, start_ts, end_ts, timeframe):
+        key = (exchange_id, pair, timeframe)
+        with self._fetch_lock:
+            fetcher = self._fetcher(exchange_id)
+            loaded = self._prices.get(key)
+            if loaded is None or start_ts < loaded[1]:
+                lo_ts = start_ts if loaded is None else min(start_ts, loaded[1])
+                hi_ts = end_ts if loaded is None else max(end_ts, loaded[2])
+                df = fetcher.fetch_historical_data(pair, _to_datetime(lo_ts), _to_datetime(hi_ts), timeframe=timeframe)
+                loaded = self._prices[key] = (df, lo_ts, hi_ts)
+            elif end_ts > loaded[2]:
+                # Only the candles from the last one held onwards are fetched again
+                df = loaded[0]
+                tail_ts = int(df["Start"].iloc[-1].timestamp() * 1000) if len(df) else loaded[2]
+                tail = fetcher.fetch_historical_data(pair, _to_datetime(tail_ts), _to_datetime(end_ts), timeframe=timeframe)
+                df = df[df["Start"] < tail["Start"].iloc[0]] if len(tail) else df
+                loaded = self._prices[key] = (pd.concat([df, tail], ignore_index=True), loaded[1], end_ts)
+        df = loaded[0]
+        timestamps = df["Start"].to_numpy(dtype="datetime64[ms]").view(np.int64)
+        lo_idx = np.searchsorted(timestamps, start_ts, side="left")
+        hi_idx = np.searchsorted(timestamps, end_ts, side="right")
+        if lo_idx == hi_idx:
+            raise ValueError(f"No price data available for {pair} on {exchange_id} in the requested range")
+        return df.iloc[lo_idx:hi_idx]
+
+    def calculate(self, pairs_allocation, daily_investment=1.0, start_date=None, end_date=None, buy_period="1d",
+                  timeframe="1d", exchange_id="binance", include_series=False):
+        total_allocation = sum(pairs_allocation.values())
+        if abs(total_allocation - 100) > 0.01:
+            raise ValueError(f"Total allocation must equal 100% (current: {total_allocation}%)")
+        bar_ms = timeframe_seconds(timeframe) * 1000
+        if end_date is None:
+            # Start of the last closed bar; the current one is still forming
+            end_ts = int(datetime.now().timestamp() * 1000) // bar_ms * bar_ms - bar_ms
+        else:
+            end_ts = int(end_date.timestamp() * 1000)
+        start_ts = int((start_date or datetime(2020, 1, 1)).timestamp() * 1000)
+        if start_ts > end_ts:
+            raise ValueError(
+                f"Start {_to_datetime(start_ts).isoformat()} is after end {_to_datetime(end_ts).isoformat()}"
+            )
+
+        results = {}
+        for pair, allocation in pairs_allocation.items():
+            amount = daily_investment * allocation / 100
+            key = (exchange_id, pair, start_ts, end_ts, buy_period, timeframe, amount)
+            result = self.results.get(key)
+            if result is None:
+                price_data = self._price_data(exchange_id, pair, start_ts, end_ts, timeframe)
+                result = DCACalculator(price_data, amount, buy_period, timeframe).results
+                self.results.put(key, result)
+            results[pair] = {"allocation": allocation, "results": result}
+
+        return {
+            "exchange": exchange_id,
+            "start": _to_datetime(start_ts).isoformat(),
+            "end": _to_datetime(end_ts).isoformat(),
+            "buy_period": buy_period,
+            "timeframe": timeframe,
+            "daily_investment": daily_investment,
+            "pairs": {pair: _pair_summary(data, include_series) for pair, data in results.items()},
+            "portfolio": _portfolio_summary(PortfolioAggregate(results), include_series),
+        }
+
+    def status(self):
+        return {
+            "status": "ok",
+            "exchanges": sorted(self._fetchers),
+            "price_series": len(self._prices),
+            "result_cache": self.results.stats(),
+        }
+
+
+def _to_datetime(ts):
+    return datetime.fromtimestamp(ts / 1000)
+
+
+def _number(value):
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def _series(values):
+    return [None if math.isnan(v) else v for v in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def _pair_summary(data, include_series):
+    r = data["results"]
+    summary = {"allocation": data["allocation"], "current_price": _number(r.prices[-1])}
+    summary.update((name, _number(r[name])) for name in SUMMARY_FIELDS)
+    summary["pnl"] = summary["current_value"] - summary["total_invested"]
+    summary["pnl_percentage"] = summary["pnl"] / summary["total_invested"] * 100 if summary["total_invested"] else 0.0
+    if include_series:
+        summary["series"] = {"timestamps": r.timestamps.tolist(), **{name: _series(r[name]) for name in SERIES_FIELDS}}
+    return summary
+
+
+def _portfolio_summary(portfolio, include_series):
+    summary = {
+        "total_invested": _number(portfolio.total_invested),
+        "current_value": _number(portfolio.current_value),
+        "pnl_percentage": _number(portfolio.pnl_percentages[-1]),
+        "max_drawdown": _number(portfolio.max_drawdown),
+        "volatility": _number(portfolio.volatility),
+        "sharpe_ratio": _number(portfolio.sharpe_ratio),
+        "weights": {pair: _number(weight) for pair, weight in portfolio.current_weights.items()},
+    }
+    if include_series:
+        summary["series"] = {
+            "timestamps": portfolio.timestamps.tolist(),
+            "values": _series(portfolio.total_values),
+            "costs": _series(portfolio.total_costs),
+        }
+    return summary
+
+
+def parse_request(params):
+    """Turn query-string or JSON parameters into ``DCAService.calculate`` arguments"""
+    pairs = params.get("pairs", "BTC/USDT:100")
+    try:
+        if isinstance(pairs, str):
+            pairs = dict(item.rsplit(":", 1) for item in pairs.split(","))
+        pairs_allocation = {pair.strip(): float(allocation) for pair, allocation in pairs.items()}
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError("Invalid pair format. Use PAIR:PERCENTAGE, e.g. BTC/USDT:60,ETH/USDT:40")
+
+    end_date = datetime.strptime(params["end"], "%Y-%m-%d") if params.get("end") else None
+    if params.get("last_days"):
+        start_date = (end_date or datetime.now()) - timedelta(days=int(params["last_days"]))
+    else:
+        start_date = datetime.strptime(params.get("start") or "2020-01-01", "%Y-%m-%d")
+
+    return {
+        "pairs_allocation": pairs_allocation,
+        "daily_investment": float(params.get("daily_investment", params.get("amount", 1.0))),
+        "start_date": start_date,
+        "end_date": end_date,
+        "buy_period": params.get("buy_period", "1d"),
+        "timeframe": params.get("timeframe", "1d"),
+        "exchange_id": params.get("exchange", "binance"),
+        "include_series": str(params.get("series", "")).lower() in ("1", "true", "yes"),
+    }
+
+
+class DCARequestHandler(BaseHTTPRequestHandler):
+    """``GET /dca?pairs=BTC/USDT:80,ETH/USDT:20&start=2021-01-01`` or ``POST /dca`` with a JSON body"""
+
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, self.service.status())
+        if url.path != "/dca":
+            return self._send(404, {"error": f"Unknown endpoint {url.path}"})
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self._calculate(params)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/dca":
+            return self._send(404, {"error": f"Unknown endpoint {self.path}"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "Request body must be JSON"})
+        if not isinstance(params, dict):
+            return self._send(400, {"error": "Request body must be a JSON object"})
+        self._calculate(params)
+
+    def _calculate(self, params):
+        try:
+            self._send(200, self.service.calculate(**parse_request(params)))
+        except (ValueError, KeyError) as e:
+            self._send(400, {"error": str(e)})
+        except ccxt.NetworkError as e:
+            self._send(503, {"error": f"Network error while fetching data: {e}"})
+        except ccxt.ExchangeError as e:
+            self._send(502, {"error": f"Exchange error: {e}"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        console.print(f"[dim]{self.address_string()} {format % args}[/dim]")
+
+
+def make_server(service, host="127.0.0.1", port=8000):
+    handler = type("BoundDCARequestHandler", (DCARequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
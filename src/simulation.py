@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from .calculator import SECONDS_PER_DAY, bars_per_buy, parse_buy_period_seconds, price_arrays
+from .profiling import profiler
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class DCAMonteCarlo:
+    """Run a DCA schedule over thousands of synthetic price paths.
+
+    Paths are built from the log returns of ``price_data``, either by
+    circular block bootstrap (``method="bootstrap"``, blocks of
+    ``block_size`` bars keep short-term autocorrelation) or as geometric
+    Brownian motion with the observed drift and volatility
+    (``method="gbm"``). Each path starts at the last observed price and runs
+    ``horizon`` bars (default: as long as the history). The schedule is the
+    one ``DCACalculator`` uses and is applied to ``batch_size`` paths at a
+    time as one ``paths x bars`` matrix, so memory stays bounded however
+    many paths are requested. ``results`` holds one row per path and
+    ``percentiles`` the distribution of each outcome.
+    """
+
+    METHODS = ("bootstrap", "gbm")
+
+    def __init__(self, price_data, daily_investment=1.0, buy_period="1d", timeframe="1d", paths=10_000,
+                 horizon=None, method="bootstrap", block_size=20, batch_size=1000, seed=None):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown simulation method: {method}. Use one of {', '.join(self.METHODS)}")
+        _, prices = price_arrays(price_data)
+        if len(prices) < 2:
+            raise ValueError("At least two candles are needed to simulate price paths")
+        self.log_returns = np.diff(np.log(prices, dtype=np.float64))
+        self.last_price = float(prices[-1])
+        self.buy_period = bars_per_buy(buy_period, timeframe)
+        self.investment_per_buy = daily_investment * parse_buy_period_seconds(buy_period) / SECONDS_PER_DAY
+        self.paths = paths
+        self.horizon = horizon or len(prices)
+        if self.horizon < self.buy_period:
+            raise ValueError(f"Horizon of {self.horizon} bars is shorter than one buy period")
+        self.method = method
+        self.block_size = min(block_size, len(self.log_returns))
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        with profiler.span("monte_carlo", paths=paths, horizon=self.horizon):
+            self.results = self._simulate()
+        self.percentiles = self.results.quantile(np.array(PERCENTILES) / 100)
+        self.percentiles.index = [f"p{p}" for p in PERCENTILES]
+
+    def _simulate(self):
+        # The buy schedule is the same on every path, only the prices differ
+        investments = np.zeros(self.horizon)
+        investments[self.buy_period - 1::self.buy_period] = self.investment_per_buy
+        total_invested = np.cumsum(investments)
+
+        outcomes = [
+            self._evaluate_batch(self._price_paths(min(self.batch_size, self.paths - done)), investments,
+                                 total_invested)
+            for done in range(0, self.paths, self.batch_size)
+        ]
+        return pd.DataFrame({key: np.concatenate([o[key] for o in outcomes]) for key in outcomes[0]})
+
+    def _price_paths(self, count):
+        steps = self.horizon - 1
+        if self.method == "gbm":
+            mu, sigma = self.log_returns.mean(), self.log_returns.std()
+            increments = self.rng.normal(mu, sigma, size=(count, steps))
+        else:
+            blocks = -(-steps // self.block_size)
+            starts = self.rng.integers(0, len(self.log_returns), size=(count, blocks, 1))
+            idx = (starts + np.arange(self.block_size)) % len(self.log_returns)
+            increments = self.log_returns[idx.reshape(count, -1)[:, :steps]]
+        log_paths = np.concatenate([np.zeros((count, 1)), np.cumsum(increments, axis=1)], axis=1)
+        return self.last_price * np.exp(log_paths)
+
+    @staticmethod
+    def _evaluate_batch(prices, investments, total_invested):
+        total_crypto = np.cumsum(investments / prices, axis=1)
+        values = total_crypto * prices
+
+        rolling_max = np.maximum.accumulate(values, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(rolling_max > 0, (values - rolling_max) / rolling_max * 100, 0.0)
+
+        invested_mask = total_invested > 0
+        negative_days = np.sum((values < total_invested) & invested_mask, axis=1)
+        invested_days = invested_mask.sum()
+        final_invested = total_invested[-1]
+        # Copy the last column so the batch matrices can be freed
+        final_values = values[:, -1].copy()
+
+        return {
+            "final_value": final_values,
+            "pnl_percentage": (final_values - final_invested) / final_invested * 100,
+            "max_drawdown": drawdowns.min(axis=1),
+            "fear_index": negative_days / invested_days * 100,
+            "final_price": prices[:, -1].copy(),
+        }
+
+    @property
+    def total_invested(self):
+        return np.floor(self.horizon / self.buy_period) * self.investment_per_buy
+
+    def probability_of_loss(self):
+        """Share of paths that end below the amount invested, in percent"""
+        return (self.results["pnl_percentage"] < 0).mean() * 100
+
+    def print_summary(self, console, title):
+        from rich.table import Table
+        from rich import box
+
+        table = Table(title=title, box=box.ROUNDED, header_style="bold cyan")
+        table.add_column("Percentile", style="cyan")
+        table.add_column("Final Value", justify="right")
+        table.add_column("P/L %", justify="right")
+        table.add_column("Max Drawdown", justify="right")
+        table.add_column("Fear Index", justify="right")
+        for name, row in self.percentiles.iterrows():
+            color = "green" if row["pnl_percentage"] >= 0 else "red"
+            table.add_row(
+                name,
+                f"${row['final_value']:,.2f}",
+                f"[{color}]{row['pnl_percentage']:+.2f}%[/{color}]",
+                f"{row['max_drawdown']:.2f}%",
+                f"{row['fear_index']:.1f}%",
+            )
+        table.caption = (
+            f"{self.paths:,} {self.method} paths of {self.horizon:,} bars, "
+            f"${self.total_invested:,.2f} invested, {self.probability_of_loss():.1f}% end at a loss"
+        )
+        console.print(table)
@@ -0,0 +1,166 @@
+import numpy as np
+from .calculator import SECONDS_PER_DAY, timeframe_seconds
+
+
+class FixedInterval:
+    """Plain DCA: the same amount on every buy bar"""
+
+    name = "fixed"
+
+    def __call__(self, prices, schedule, timeframe="1d"):
+        return schedule
+
+
+class ValueAveraging:
+    """Invest whatever brings the position value up to a target path.
+
+    The target grows by the scheduled amount on every buy bar. The units
+    held after buy k are then ``k * amount / price_k`` (or more, when sells
+    are not allowed and the position is already above target), so the whole
+    schedule follows from one running maximum instead of a loop over buys.
+    """
+
+    name = "value-averaging"
+
+    def __init__(self, allow_sells=False):
+        self.allow_sells = allow_sells
+
+    def __call__(self, prices, schedule, timeframe="1d"):
+        buys = np.flatnonzero(schedule)
+        if not len(buys):
+            return schedule
+        target_units = np.cumsum(schedule[buys]) / prices[buys]
+        if not self.allow_sells:
+            target_units = np.maximum.accumulate(target_units)
+        investments = np.zeros_like(schedule)
+        investments[buys] = np.diff(target_units, prepend=0.0) * prices[buys]
+        return investments
+
+
+class BuyTheDip:
+    """Buy ``multiplier`` times the amount while the price is below the cost basis.
+
+    ``threshold`` is how far below the cost basis (as a fraction) the price
+    has to be. Each buy changes the basis the next one is compared with, so
+    this kernel walks the buy bars in order; every other bar is skipped.
+    """
+
+    name = "buy-the-dip"
+
+    def __init__(self, multiplier=2.0, threshold=0.0):
+        self.multiplier = multiplier
+        self.threshold = threshold
+
+    def __call__(self, prices, schedule, timeframe="1d"):
+        investments = np.zeros_like(schedule)
+        invested = units = 0.0
+        for i in np.flatnonzero(schedule):
+            price, amount = prices[i], schedule[i]
+            if units > 0 and price < invested / units * (1 - self.threshold):
+                amount *= self.multiplier
+            investments[i] = amount
+            invested += amount
+            units += amount / price
+        return investments
+
+
+class MovingAverageGate:
+    """Only buy while the price is above (or ``below``) its ``window``-day moving average.
+
+    With ``carry=True`` the amounts of skipped buys are saved up and
+    invested at the next buy the gate lets through. There are no buys
+    before the first full window.
+    """
+
+    name = "ma-gate"
+
+    def __init__(self, window=200, below=False, carry=True):
+        self.window = window
+        self.below = below
+        self.carry = carry
+
+    def __call__(self, prices, schedule, timeframe="1d"):
+        bars = max(1, self.window * SECONDS_PER_DAY // timeframe_seconds(timeframe))
+        open_ = np.zeros(len(prices), dtype=bool)
+        if bars <= len(prices):
+            sums = np.cumsum(np.concatenate([[0.0], prices]))
+            average = (sums[bars:] - sums[:-bars]) / bars
+            tail = prices[bars - 1:]
+            open_[bars - 1:] = tail < average if self.below else tail > average
+        gated = open_ & (schedule != 0)
+        if not self.carry:
+            return np.where(gated, schedule, 0.0)
+
+        # Each open buy takes everything scheduled since the previous open buy
+        saved = np.cumsum(schedule)
+        buys = np.flatnonzero(gated)
+        investments = np.zeros_like(schedule)
+        investments[buys] = np.diff(saved[buys], prepend=0.0)
+        return investments
+
+
+STRATEGIES = {
+    strategy.name: strategy for strategy in (FixedInterval, ValueAveraging, BuyTheDip, MovingAverageGate)
+}
+
+
+def get_strategy(name):
+    """Build a strategy from ``name`` or ``name:arg``, e.g. ``buy-the-dip:3`` or ``ma-gate:100``"""
+    name, _, arg = name.partition(":")
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}. Use one of {', '.join(STRATEGIES)}")
+    strategy = STRATEGIES[name]
+    if not arg:
+        return strategy()
+    if strategy is BuyTheDip:
+        return strategy(multiplier=float(arg))
+    if strategy is MovingAverageGate:
+        return strategy(window=int(arg))
+    raise ValueError(f"Strategy {name} takes no argument")
+
+
+def compare_strategies(price_data, strategies, daily_investment=1.0, buy_period="1d", timeframe="1d"):
+    """Summary metrics of every strategy on the same candles, one row per strategy"""
+    import pandas as pd
+    from .calculator import DCACalculator
+
+    rows = {}
+    # Names given as strings label their row as written, e.g. "ma-gate:50" next to "ma-gate:200"
+    for strategy in strategies:
+        r = DCACalculator(price_data, daily_investment, buy_period, timeframe, strategy=strategy).results
+        pnl = r.current_value - r.total_invested
+        rows[strategy if isinstance(strategy, str) else strategy.name] = {
+            "total_invested": r.total_invested,
+            "current_value": r.current_value,
+            "pnl_percentage": pnl / r.total_invested * 100 if r.total_invested else 0.0,
+            "cost_basis": r.cost_basis,
+            "max_drawdown": r.max_drawdown,
+            "fear_index": r.fear_index,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def print_comparison(console, comparison, title):
+    from rich.table import Table
+    from rich import box
+
+    table = Table(title=title, box=box.ROUNDED, header_style="bold cyan")
+    table.add_column("Strategy", style="cyan", no_wrap=True)
+    table.add_column("Invested", justify="right")
+    table.add_column("Value", justify="right")
+    table.add_column("P/L %", justify="right")
+    table.add_column("Basis", justify="right")
+    table.add_column("Max DD", justify="right")
+    table.add_column("Fear", justify="right")
+    for name, row in comparison.sort_values("pnl_percentage", ascending=False).iterrows():
+        color = "green" if row["pnl_percentage"] >= 0 else "red"
+        table.add_row(
+            name,
+            f"${row['total_invested']:,.2f}",
+            f"${row['current_value']:,.2f}",
+            f"[{color}]{row['pnl_percentage']:+.2f}%[/{color}]",
+            f"${row['cost_basis']:,.2f}",
+            f"{row['max_drawdown']:.2f}%",
+            f"{row['fear_index']:.1f}%",
+        )
+    console.print(table)
@@ -0,0 +1,162 @@
+import itertools
+import numpy as np
+import pandas as pd
+from .calculator import SECONDS_PER_DAY, bars_per_buy, parse_buy_period_seconds, price_arrays
+
+
+class DCASweep:
+    """Evaluate a grid of DCA scenarios over one price series in a single pass.
+
+    Every (start date, buy period, amount) combination becomes one row of a
+    2-D scenarios x bars matrix, so cumulative sums, drawdowns and the fear
+    index are computed for the whole grid at once, ``chunk_size`` rows at a
+    time. Scenario metrics match what a ``DCACalculator`` built on the price
+    data (a DataFrame or ``PriceWindow`` of ``timeframe`` candles) from that
+    start date would report.
+    """
+
+    def __init__(self, price_data, buy_periods=("1d",), start_dates=None, daily_investments=(1.0,),
+                 timeframe="1d", chunk_size=256):
+        self.price_data = price_data
+        self.timeframe = timeframe
+        self.timestamps, prices = price_arrays(price_data)
+        self.prices = prices.astype(np.float64, copy=False)
+        self.buy_periods = list(buy_periods)
+        self.start_dates = (
+            list(start_dates) if start_dates is not None else [pd.to_datetime(self.timestamps[0], unit="ms")]
+        )
+        self.daily_investments = np.asarray(daily_investments, dtype=np.float64)
+        self.chunk_size = chunk_size
+        self.results = self._calculate_sweep()
+
+    def _calculate_sweep(self):
+        prices = self.prices
+        periods = np.array([bars_per_buy(p, self.timeframe) for p in self.buy_periods])
+        # Amount per buy in days' worth of daily_investment, as in DCACalculator
+        period_days = np.array([parse_buy_period_seconds(p) / SECONDS_PER_DAY for p in self.buy_periods])
+        start_ts = pd.to_datetime(self.start_dates).to_numpy().astype("datetime64[ms]").view(np.int64)
+        starts = np.searchsorted(self.timestamps, start_ts, side="left")
+
+        grid = np.array(list(itertools.product(
+            range(len(starts)), range(len(periods)), range(len(self.daily_investments))
+        )))
+        metrics = [
+            self._evaluate_chunk(
+                prices, starts[chunk[:, 0]], periods[chunk[:, 1]],
+                self.daily_investments[chunk[:, 2]] * period_days[chunk[:, 1]]
+            )
+            for chunk in np.array_split(grid, max(1, -(-len(grid) // self.chunk_size)))
+        ]
+        metrics = {key: np.concatenate([m[key] for m in metrics]) for key in metrics[0]}
+
+        return pd.DataFrame({
+            "start_date": pd.to_datetime(self.start_dates)[grid[:, 0]],
+            "buy_period": np.asarray(self.buy_periods)[grid[:, 1]],
+            "daily_investment": self.daily_investments[grid[:, 2]],
+            **metrics,
+            "pnl": metrics["current_value"] - metrics["total_invested"],
+        })
+
+    @staticmethod
+    def _evaluate_chunk(prices, starts, periods, amounts):
+        """Compute the final metrics for a batch of (start, period, amount per buy) scenarios"""
+        offsets = np.arange(len(prices))[None, :] - starts[:, None]
+        buys = (offsets >= 0) & ((offsets + 1) % periods[:, None] == 0)
+        investments = np.where(buys, amounts[:, None], 0.0)
+
+        total_invested = np.cumsum(investments, axis=1)
+        total_crypto = np.cumsum(investments / prices, axis=1)
+        current_values = total_crypto * prices
+
+        invested_mask = total_invested > 0
+        negative_pnl_days = np.sum((current_values < total_invested) & invested_mask, axis=1)
+        total_days = np.sum(invested_mask, axis=1)
+
+        rolling_max = np.maximum.accumulate(current_values, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(rolling_max > 0, (current_values - rolling_max) / rolling_max * 100, 0.0)
+
+        final_invested = total_invested[:, -1]
+        final_crypto = total_crypto[:, -1]
+        has_crypto = final_crypto > 0
+        cost_basis = np.where(has_crypto, final_invested / np.where(has_crypto, final_crypto, 1.0), prices[-1])
+
+        return {
+            "total_invested": final_invested,
+            "total_crypto": final_crypto,
+            "current_value": current_values[:, -1],
+            "cost_basis": cost_basis,
+            "pnl_percentage": np.where(has_crypto, (prices[-1] - cost_basis) / cost_basis * 100, 0.0),
+            "fear_index": np.where(total_days > 0, negative_pnl_days / np.maximum(total_days, 1) * 100, 0.0),
+            "negative_pnl_days": negative_pnl_days,
+            "total_days": total_days,
+            "max_drawdown": drawdowns.min(axis=1),
+        }
+
+
+class EveryStartBacktest:
+    """Backtest a DCA started on every bar of the price history in O(n).
+
+    Buys of a schedule with period ``p`` bars all fall on one residue class
+    modulo ``p``, so a strided prefix sum of ``1/price`` (each entry adds the
+    one ``p`` bars earlier) gives the crypto bought between any two buy bars
+    with a single subtraction. With ``horizon=None`` every start is evaluated
+    at the last bar ("today"), otherwise ``horizon`` bars of ``timeframe``
+    after it; starts without a full horizon are left as NaN.
+    ``holding_period_return`` is the lump-sum price return over the same
+    span, for comparison with ``pnl_percentage``; ``holding_days`` counts bars.
+    """
+
+    def __init__(self, price_data, daily_investment=1.0, buy_period="1d", timeframe="1d", horizon=None):
+        self.price_data = price_data
+        self.daily_investment = daily_investment
+        self.timeframe = timeframe
+        self.buy_period = bars_per_buy(buy_period, timeframe)
+        self.investment_per_buy = daily_investment * parse_buy_period_seconds(buy_period) / SECONDS_PER_DAY
+        self.horizon = horizon
+        self.results = self._calculate_backtest()
+
+    def _calculate_backtest(self):
+        timestamps, prices = price_arrays(self.price_data)
+        prices = prices.astype(np.float64, copy=False)
+        n = len(prices)
+        p = self.buy_period
+        investment = self.investment_per_buy
+
+        # prefix[i] = 1/prices[i] + 1/prices[i - p] + 1/prices[i - 2p] + ...
+        rows = -(-n // p)
+        padded = np.zeros(rows * p)
+        padded[:n] = 1.0 / prices
+        prefix = np.cumsum(padded.reshape(rows, p), axis=0).ravel()[:n]
+
+        starts = np.arange(n)
+        ends = np.full(n, n - 1) if self.horizon is None else starts + self.horizon - 1
+        complete = ends < n
+        ends = np.minimum(ends, n - 1)
+
+        first_buy = starts + p - 1
+        n_buys = np.where(ends >= first_buy, (ends - first_buy) // p + 1, 0)
+        last_buy = first_buy + (n_buys - 1) * p
+        has_buys = n_buys > 0
+        before_first = first_buy - p
+        crypto_through_last = prefix[np.where(has_buys, last_buy, 0)]
+        crypto_before_first = np.where(before_first >= 0, prefix[np.maximum(before_first, 0)], 0.0)
+
+        total_crypto = np.where(has_buys, (crypto_through_last - crypto_before_first) * investment, 0.0)
+        total_invested = n_buys * investment
+        final_prices = prices[ends]
+        final_value = total_crypto * final_prices
+        cost_basis = np.where(has_buys, total_invested / np.where(has_buys, total_crypto, 1.0), final_prices)
+        pnl_percentage = np.where(has_buys, (final_prices - cost_basis) / cost_basis * 100, 0.0)
+
+        results = pd.DataFrame({
+            "total_invested": total_invested.astype(np.float64),
+            "total_crypto": total_crypto,
+            "cost_basis": cost_basis,
+            "final_value": final_value,
+            "pnl_percentage": pnl_percentage,
+            "holding_period_return": (final_prices / prices - 1) * 100,
+            "holding_days": ends - starts + 1,
+        }, index=pd.Index(pd.to_datetime(timestamps, unit="ms"), name="start_date"))
+        results.loc[~complete] = np.nan
+        return results
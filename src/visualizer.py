@@ -1,17 +1,32 @@
-import matplotlib.pyplot as plt
+import matplotlib
+import matplotlib.style
 import numpy as np
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
 from rich.console import Console
 from rich.table import Table
 from rich import box
+from .portfolio import PortfolioAggregate
+from .profiling import profiler
+
+# Charts are only ever written to files, never shown
+matplotlib.use('Agg')
 
 console = Console()
 
 class ChartStyle:
-    @staticmethod
-    def setup():
-        plt.style.use('seaborn-v0_8-darkgrid')
-        plt.rcParams.update({
+    _applied = False
+
+    @classmethod
+    def setup(cls):
+        # rcParams are process-wide, so apply them once per process
+        if cls._applied:
+            return
+        matplotlib.style.use('seaborn-v0_8-darkgrid')
+        matplotlib.rcParams.update({
             'figure.facecolor': '#ffffff',
             'axes.facecolor': '#f8f9fa',
             'axes.grid': True,
@@ -29,26 +44,41 @@ class ChartStyle:
             'legend.fontsize': 9,
             'figure.titlesize': 14,
             'figure.subplot.hspace': 0.3,
-            'axes.prop_cycle': plt.cycler('color', 
+            'axes.prop_cycle': matplotlib.cycler('color', 
                 ['#3498db', '#2ecc71', '#9b59b6', '#f1c40f', '#e74c3c', '#1abc9c'])
         })
+        cls._applied = True
 
 class DCAVisualizer:
-    def __init__(self, results, token_symbol, start_date, end_date):
+    def __init__(self, results, token_symbol, start_date, end_date, dpi=300, image_format='png'):
         self.results = results
         self.token_symbol = token_symbol
         self.start_date = start_date
         self.end_date = end_date
+        self.dpi = dpi
+        self.image_format = image_format
         ChartStyle.setup()
 
+    def _new_figure(self):
+        fig = Figure(figsize=(12, 8))
+        FigureCanvasAgg(fig)
+        return fig
+
+    def _save(self, fig, name):
+        path = f'dca/dca_analysis_{name}.{self.image_format}'
+        with profiler.span("chart_encode", chart=name):
+            fig.savefig(path, dpi=self.dpi, bbox_inches='tight', pad_inches=0.2)
+        profiler.count("chart_bytes_written", os.path.getsize(path))
+        return path
+
     def plot_single_pair(self, timestamp):
         r = self.results
-        fig = plt.figure(figsize=(12, 8))
+        fig = self._new_figure()
         
         # Create two subplots with proper spacing
-        gs = plt.GridSpec(2, 1, height_ratios=[2, 1], hspace=0.3)
-        ax1 = plt.subplot(gs[0])
-        ax2 = plt.subplot(gs[1])
+        gs = fig.add_gridspec(2, 1, height_ratios=[2, 1], hspace=0.3)
+        ax1 = fig.add_subplot(gs[0])
+        ax2 = fig.add_subplot(gs[1])
         
         # Price and cost basis plot
         ax1.plot(r['dates'], r['prices'], label='Market Price', 
@@ -58,10 +88,10 @@ class DCAVisualizer:
         
         # Simplified fill between
         ax1.fill_between(r['dates'], r['prices'], r['dca_prices'],
-                        where=np.array(r['prices']) >= np.array(r['dca_prices']),
+                        where=r['prices'] >= r['dca_prices'],
                         color='#2ecc71', alpha=0.15)
         ax1.fill_between(r['dates'], r['prices'], r['dca_prices'],
-                        where=np.array(r['prices']) < np.array(r['dca_prices']),
+                        where=r['prices'] < r['dca_prices'],
                         color='#e74c3c', alpha=0.15)
         
         ax1.set_ylabel('Price (USD)')
@@ -78,10 +108,10 @@ class DCAVisualizer:
                     color='#34495e', linewidth=2, linestyle='--')
             
             ax2.fill_between(r['dates'], r['values'], r['costs'],
-                           where=np.array(r['values']) >= np.array(r['costs']),
+                           where=r['values'] >= r['costs'],
                            color='#2ecc71', alpha=0.15)
             ax2.fill_between(r['dates'], r['values'], r['costs'],
-                           where=np.array(r['values']) < np.array(r['costs']),
+                           where=r['values'] < r['costs'],
                            color='#e74c3c', alpha=0.15)
             
             ax2.set_ylabel('Position Value (USD)')
@@ -90,8 +120,8 @@ class DCAVisualizer:
             ax2.legend(loc='center left', bbox_to_anchor=(1, 0.5))
         
         # Format y-axis labels as currency
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax1.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         # Add statistics box
         stats = (
@@ -102,13 +132,13 @@ class DCAVisualizer:
             f"Max Drawdown: {r.get('max_drawdown', 0):+.1f}%"
         )
         
-        plt.figtext(0.02, 0.02, stats,
+        fig.text(0.02, 0.02, stats,
                    bbox=dict(facecolor='white', edgecolor='#95a5a6', alpha=0.9),
                    verticalalignment='bottom',
                    horizontalalignment='left',
                    fontsize=9)
         
-        plt.suptitle(
+        fig.suptitle(
             f'{self.token_symbol} DCA Analysis - {self.start_date.strftime("%Y-%m-%d")} to {self.end_date.strftime("%Y-%m-%d")}',
             y=0.95,
             fontsize=14,
@@ -116,36 +146,55 @@ class DCAVisualizer:
         )
         
         # Adjust layout to prevent text cutoff and warnings
-        plt.subplots_adjust(right=0.85, bottom=0.15, top=0.9)
+        fig.subplots_adjust(right=0.85, bottom=0.15, top=0.9)
         
         # Save with high quality
-        plt.savefig(f'dca/dca_analysis_{timestamp}_{self.token_symbol.lower()}.png', 
-                   dpi=300, bbox_inches='tight',
-                   pad_inches=0.2)
-        plt.close()
+        return self._save(fig, f'{timestamp}_{self.token_symbol.lower()}')
+
+    def plot_rolling_metrics(self, timestamp):
+        rolling = self.results.rolling
+        dates = self.results.dates
+        fig = self._new_figure()
+        axes = fig.subplots(3, 1, sharex=True)
+        panels = (
+            (rolling.volatility, 'Rolling Volatility (annualized)', lambda x, p: f'{x:.0f}%'),
+            (rolling.sharpe_ratio, 'Rolling Sharpe Ratio', lambda x, p: f'{x:.1f}'),
+            (rolling.drawdown, 'Rolling Drawdown', lambda x, p: f'{x:.0f}%'),
+        )
+        for ax, (series, title, formatter) in zip(axes, panels):
+            for days in rolling.windows:
+                ax.plot(dates, series[days], label=f'{days}d', linewidth=1.2)
+            ax.set_title(title, pad=10)
+            ax.yaxis.set_major_formatter(FuncFormatter(formatter))
+            ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
+        axes[1].axhline(y=0, color='#95a5a6', linestyle='-', linewidth=1)
+
+        fig.suptitle(
+            f'{self.token_symbol} Rolling Risk - {self.start_date.strftime("%Y-%m-%d")} to {self.end_date.strftime("%Y-%m-%d")}',
+            y=0.95,
+            fontsize=14,
+            fontweight='bold'
+        )
+        fig.subplots_adjust(right=0.85, top=0.86, hspace=0.35)
+        return self._save(fig, f'{timestamp}_{self.token_symbol.lower()}_rolling')
 
     def plot_total_portfolio(self, all_results, timestamp):
-        fig = plt.figure(figsize=(12, 8))
-        gs = plt.GridSpec(3, 1, height_ratios=[2, 1, 0.3], hspace=0.3)
-        ax1 = plt.subplot(gs[0])
-        ax2 = plt.subplot(gs[1])
-        ax3 = plt.subplot(gs[2])
+        fig = self._new_figure()
+        gs = fig.add_gridspec(3, 1, height_ratios=[2, 1, 0.3], hspace=0.3)
+        ax1 = fig.add_subplot(gs[0])
+        ax2 = fig.add_subplot(gs[1])
+        ax3 = fig.add_subplot(gs[2])
         
-        dates = None
-        colors = plt.cm.tab10(np.linspace(0, 1, len(all_results)))
+        # Pairs listed at different times are aligned on one shared timeline
+        portfolio = PortfolioAggregate(all_results)
+        dates = portfolio.dates
+        total_values = portfolio.total_values
+        colors = matplotlib.colormaps['tab10'](np.linspace(0, 1, len(all_results)))
         
         # Top plot: Asset value lines
-        for (pair, data), color in zip(all_results.items(), colors):
-            r = data['results']
-            if dates is None:
-                dates = r['dates']
-                total_values = np.zeros(len(dates))
-                
-            values = np.array(r['values']) if 'values' in r else \
-                    np.array(r['prices']) * (r['total_invested'] / r['dca_prices'][-1])
+        for (pair, data), values, color in zip(all_results.items(), portfolio.values, colors):
             ax1.plot(dates, values, label=f"{pair} ({data['allocation']}%)", 
                     color=color, alpha=0.7, linewidth=2)
-            total_values += values
         
         # Add total portfolio value line
         ax1.plot(dates, total_values, label='Total Portfolio', 
@@ -157,8 +206,8 @@ class DCAVisualizer:
         ax1.legend(loc='center left', bbox_to_anchor=(1, 0.5))
         
         # Bottom plot: Total portfolio value and cost basis
-        total_invested = sum(data['results']['total_invested'] for data in all_results.values())
-        total_value = sum(data['results']['current_value'] for data in all_results.values())
+        total_invested = portfolio.total_invested
+        total_value = portfolio.current_value
         pnl_percentage = ((total_value - total_invested) / total_invested * 100) if total_invested > 0 else 0
         
         # Plot total portfolio value with filled area
@@ -168,14 +217,8 @@ class DCAVisualizer:
         ax2.fill_between(dates, total_values, alpha=0.15, 
                         color='#2ecc71' if pnl_percentage >= 0 else '#e74c3c')
         
-        # Calculate and plot cost basis line
-        total_costs = np.zeros(len(dates))
-        for data in all_results.values():
-            r = data['results']
-            if 'costs' in r:
-                total_costs += np.array(r['costs'])
-        
-        ax2.plot(dates, total_costs, label='Total Investment', 
+        # Plot cost basis line
+        ax2.plot(dates, portfolio.total_costs, label='Total Investment', 
                 color='#34495e', linewidth=2, linestyle='--')
         
         ax2.set_ylabel('Portfolio Value (USD)')
@@ -209,8 +252,8 @@ class DCAVisualizer:
             spine.set_visible(False)
         
         # Format y-axis labels as currency
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax1.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
+        ax2.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         # Add portfolio stats box
         stats = (
@@ -219,13 +262,13 @@ class DCAVisualizer:
             f"Total Return: {pnl_percentage:+.1f}%"
         )
         
-        plt.figtext(0.02, 0.02, stats,
+        fig.text(0.02, 0.02, stats,
                    bbox=dict(facecolor='white', edgecolor='#95a5a6', alpha=0.9),
                    verticalalignment='bottom',
                    horizontalalignment='left',
                    fontsize=9)
         
-        plt.suptitle(
+        fig.suptitle(
             f'Portfolio Analysis - {self.start_date.strftime("%Y-%m-%d")} to {self.end_date.strftime("%Y-%m-%d")}',
             y=0.95,
             fontsize=14,
@@ -233,10 +276,42 @@ class DCAVisualizer:
         )
         
         # Adjust layout to prevent text cutoff and warnings
-        plt.subplots_adjust(right=0.85, bottom=0.1, top=0.9)
+        fig.subplots_adjust(right=0.85, bottom=0.1, top=0.9)
         
         # Save with high quality
-        plt.savefig(f'dca/dca_analysis_{timestamp}_total_portfolio.png', 
-                   dpi=300, bbox_inches='tight',
-                   pad_inches=0.2)
-        plt.close()
\ No newline at end of file
+        return self._save(fig, f'{timestamp}_total_portfolio')
+
+
+def _render_single_pair(pair, results, start_date, end_date, timestamp, dpi, image_format, rolling=False):
+    token = pair.split("/")[0]
+    visualizer = DCAVisualizer(results, token, start_date, end_date, dpi, image_format)
+    paths = [visualizer.plot_single_pair(timestamp)]
+    if rolling:
+        paths.append(visualizer.plot_rolling_metrics(timestamp))
+    return paths
+
+
+def render_pair_charts(all_results, start_date, end_date, timestamp, dpi=300, image_format='png',
+                       max_workers=None, on_done=None, rolling=False):
+    """Render every pair's chart in a process pool, calling ``on_done(pair)`` as each finishes.
+
+    With ``rolling=True`` each pair also gets a rolling volatility, Sharpe
+    ratio and drawdown chart. Returns the written paths per pair.
+    """
+    paths = {}
+    # Workers run in other processes, so only the fan-out as a whole is timed here
+    with profiler.span("render_pair_charts"), ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _render_single_pair, pair, data['results'], start_date, end_date,
+                timestamp, dpi, image_format, rolling
+            ): pair
+            for pair, data in all_results.items()
+        }
+        for future in as_completed(futures):
+            pair = futures[future]
+            paths[pair] = future.result()
+            profiler.count("chart_bytes_written", sum(os.path.getsize(path) for path in paths[pair]))
+            if on_done:
+                on_done(pair)
+    return paths
@@ -0,0 +1,22 @@
+import json
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from synthetic import synthetic_ohlcv  # noqa: E402
+
+
+@pytest.fixture
+def recording_dir(tmp_path):
+    """Replay recordings of two synthetic daily pairs on a ``fake`` exchange"""
+    record_dir = tmp_path / "rec"
+    (record_dir / "fake").mkdir(parents=True)
+    for seed, symbol in enumerate(("BTC_USDT", "ETH_USDT")):
+        rows = synthetic_ohlcv(1500, "1d", seed).tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        (record_dir / "fake" / f"{symbol}_1d.json").write_text(json.dumps(rows))
+    return record_dir
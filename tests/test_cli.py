@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from conftest import ROOT
+
+
+def run_cli(cwd, *args):
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "dca_btc.py"), *args],
+        cwd=cwd, capture_output=True, text=True, timeout=120,
+    )
+
+
+def test_memmap_cache_end_to_end(tmp_path, recording_dir):
+    args = (
+        "--replay", str(recording_dir), "--exchange", "fake", "--pairs", "BTC/USDT:60", "ETH/USDT:40",
+        "--start-date", "2020-01-01", "--end-date", "2023-06-01", "--plot-type", "none",
+        "--cache-format", "memmap", "--cache-dir", str(tmp_path / "cache"), "--max-concurrency", "1",
+    )
+    first = run_cli(tmp_path, *args)
+    assert first.returncode == 0, first.stdout + first.stderr
+    assert "Analysis Complete" in first.stdout
+    assert os.path.isdir(tmp_path / "cache" / "fake")
+
+    # The second run is served from the memory-mapped store
+    second = run_cli(tmp_path, *args)
+    assert second.returncode == 0, second.stdout + second.stderr
+    assert "Analysis Complete" in second.stdout
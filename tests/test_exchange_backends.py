@@ -0,0 +1,25 @@
+import json
+from datetime import datetime
+from src.exchange_backends import RecordingExchange, ReplayExchange
+from src.price_fetcher import PriceDataFetcher
+from synthetic import synthetic_exchange
+
+
+def test_recording_concurrent_segments(tmp_path):
+    source = synthetic_exchange(["BTC/USDT"], 8000, "1h", page_limit=100)
+    recorder = RecordingExchange(source, tmp_path)
+    fetcher = PriceDataFetcher(exchange=recorder, fetch_workers=4)
+    start, end = datetime(2020, 1, 1), datetime(2020, 11, 1)
+    fetched = fetcher.fetch_historical_data("BTC/USDT", start, end, timeframe="1h")
+    path = tmp_path / "synthetic" / "BTC_USDT_1h.json"
+    # Pages stay in memory until the flush
+    assert not path.exists()
+    recorder.flush()
+
+    with open(path) as f:
+        recorded = json.load(f)
+    assert [row[0] for row in recorded] == sorted({row[0] for row in recorded})
+    assert len(recorded) >= len(fetched)
+
+    replayed = PriceDataFetcher(exchange=ReplayExchange(tmp_path, "synthetic"), fetch_workers=1)
+    assert replayed.fetch_historical_data("BTC/USDT", start, end, timeframe="1h").equals(fetched)
@@ -0,0 +1,16 @@
+from import_time import BUDGET_MS, HEAVY_MODULES, measure_import, modules_loaded_by_help
+
+
+def test_cli_import_stays_light():
+    import_ms, modules = measure_import("dca_btc")
+    assert import_ms <= BUDGET_MS
+    assert not [m for m in HEAVY_MODULES if m in modules]
+
+
+def test_help_loads_no_heavy_modules():
+    assert not [m for m in HEAVY_MODULES if m in modules_loaded_by_help()]
+
+
+def test_analysis_path_skips_matplotlib():
+    _, modules = measure_import("src.multi_pair, src.portfolio_analyzer", repeat=1)
+    assert "matplotlib" not in modules
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.calculator import IncrementalDCACalculator
+from src.exchange_backends import ReplayExchange
+from src.multi_pair import MultiPairDCAManager
+from src.price_cache import OHLCVCache
+from src.price_fetcher import PriceDataFetcher
+from src.profiling import profiler
+from synthetic import synthetic_exchange, synthetic_ohlcv
+
+
+def test_chunks_past_the_cached_range(tmp_path):
+    exchange = synthetic_exchange(["BTC/USDT"], 1500, "1d")
+    fetcher = PriceDataFetcher(exchange=exchange, cache=OHLCVCache(tmp_path), fetch_workers=1)
+    start = datetime(2020, 1, 1)
+    end = start + timedelta(days=1499)
+    cached = fetcher.fetch_historical_data("BTC/USDT", start, end)
+
+    # Nothing is left to fetch after the cached candles, so the tail pages come back empty
+    chunks = list(fetcher.fetch_historical_chunks("BTC/USDT", start, end + timedelta(days=20), chunk_bars=500))
+    assert all(len(chunk) for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), cached.reset_index(drop=True))
+
+
+def test_empty_input():
+    fetcher = PriceDataFetcher(exchange=synthetic_exchange(["BTC/USDT"], 10, "1d"))
+    assert fetcher._build_frame(np.empty((0, 6))).empty
+    calculator = IncrementalDCACalculator(daily_investment=1.0)
+    assert "no candles yet" in MultiPairDCAManager._running_totals("BTC/USDT", calculator)
+
+
+
+def test_chunks_report_gaps_across_boundaries():
+    rows = synthetic_ohlcv(1000, "1d").tolist()
+    for row in rows:
+        row[0] = int(row[0])
+    # One missing bar inside a chunk, one between the first two chunks
+    del rows[450], rows[200]
+    exchange = ReplayExchange(exchange_id="synthetic", candles={("BTC/USDT", "1d"): rows}, page_limit=100)
+    fetcher = PriceDataFetcher(exchange=exchange, fetch_workers=1)
+    profiler.enable()
+    try:
+        chunks = list(fetcher.fetch_historical_chunks(
+            "BTC/USDT", datetime(2020, 1, 1), datetime(2022, 12, 31), chunk_bars=150
+        ))
+        gaps = profiler.counters["candle_gaps"]
+    finally:
+        profiler.enabled = False
+        profiler.reset()
+    assert len(chunks[0]) == 200
+    assert gaps == 2
+    assert sum(len(chunk) for chunk in chunks) == 998
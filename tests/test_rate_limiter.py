@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+import pytest
+from src.rate_limiter import TokenBucket, backoff_delay, limiter_for, retry_after_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_burst_then_queue(clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == pytest.approx([0, 0, 0.1, 0.2])
+
+
+def test_refill_is_capped(clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+    bucket.reserve(), bucket.reserve()
+    clock.now += 0.1
+    assert bucket.reserve() == pytest.approx(0)
+    assert bucket.reserve() == pytest.approx(0.1)
+    # A long idle stretch refills no more than the capacity
+    clock.now += 60
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0, 0, 0.1])
+
+
+def test_pause_delays_the_next_reserve(clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+    bucket.pause(2)
+    assert bucket.reserve() == pytest.approx(2.1)
+    # Refill only resumes once the pause is over
+    clock.now += 2.1
+    assert bucket.reserve() == pytest.approx(0.1)
+
+
+def test_pause_keeps_the_queue(clock):
+    bucket = TokenBucket(rate=10, capacity=2, clock=clock)
+    for _ in range(4):
+        bucket.reserve()
+    bucket.pause(1)
+    assert bucket.reserve() == pytest.approx(1.3)
+
+
+def test_unlimited_bucket(clock):
+    bucket = TokenBucket(rate=0, capacity=2, clock=clock)
+    clock.now += 0.001
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0, 0, 0]
+
+
+def test_limiter_is_shared_per_exchange():
+    exchange = SimpleNamespace(id="test-limiter", rateLimit=50)
+    bucket = limiter_for(exchange)
+    assert limiter_for(SimpleNamespace(id="test-limiter", rateLimit=50)) is bucket
+    assert bucket.rate == pytest.approx(20)
+    assert limiter_for(SimpleNamespace(id="test-limiter", rateLimit=100)) is not bucket
+
+
+@pytest.mark.parametrize("attempt, step", [(1, 0.5), (3, 2.0), (20, 30.0)])
+def test_backoff_delay_bounds(attempt, step):
+    for _ in range(50):
+        assert step / 2 <= backoff_delay(attempt) <= step
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(None) is None
+    assert retry_after_seconds({}) is None
+    assert retry_after_seconds({"Retry-After": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after": "1.5"}) == 1.5
+    assert retry_after_seconds({"Retry-After": "-4"}) == 0.0
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+
+
+def test_retry_after_http_date():
+    future = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 <= retry_after_seconds({"Retry-After": format_datetime(future, usegmt=True)}) <= 30
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert retry_after_seconds({"Retry-After": format_datetime(past, usegmt=True)}) == 0.0
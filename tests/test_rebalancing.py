@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from src.calculator import DCACalculator
+from src.rebalancing import RebalancedPortfolio
+from synthetic import synthetic_frame
+
+DAY_MS = 86_400_000
+
+
+def rebalance_loop(portfolio, period_days, threshold, fee):
+    """Per-bar reference: buy each pair's contribution, then rebalance when the rule fires"""
+    prices, costs = portfolio.prices, portfolio.costs
+    targets_all = portfolio.allocations
+    units = np.zeros(len(portfolio.pairs))
+    history = np.zeros_like(prices)
+    events, fees = [], 0.0
+    previous_costs = np.zeros(len(portfolio.pairs))
+    for t, ts in enumerate(portfolio.timestamps):
+        listed = prices[:, t] > 0
+        units[listed] += (costs[listed, t] - previous_costs[listed]) / prices[listed, t]
+        previous_costs = costs[:, t]
+
+        values = units * prices[:, t]
+        total = values.sum()
+        targets = np.where(listed, targets_all, 0.0)
+        targets = targets / targets.sum()
+        fire = False
+        if period_days is not None and t > 0:
+            fire = ts // (period_days * DAY_MS) != portfolio.timestamps[t - 1] // (period_days * DAY_MS)
+        if threshold is not None and total > 0:
+            fire = fire or np.abs(values / total - targets).max() > threshold
+        if fire and total > 0:
+            cost = fee * np.abs(targets * total - values).sum()
+            units = np.where(listed, (total - cost) * targets / np.where(listed, prices[:, t], 1.0), 0.0)
+            fees += cost
+            events.append(t)
+        history[:, t] = units
+    return history, events, fees
+
+
+@pytest.fixture
+def all_results():
+    frames = [synthetic_frame(1000, "1d", seed) for seed in range(3)]
+    # The third pair is listed 300 days later
+    frames[2] = frames[2].iloc[300:]
+    return {
+        pair: {"allocation": allocation, "results": DCACalculator(frame, allocation / 10, "1w").results}
+        for pair, allocation, frame in zip(("BTC/USDT", "ETH/USDT", "SOL/USDT"), (50, 30, 20), frames)
+    }
+
+
+@pytest.mark.parametrize("every, period_days, threshold, fee", [
+    ("1m", 30, None, 0.0),
+    (None, None, 0.05, 0.0),
+    ("1w", 7, 0.02, 0.001),
+    # Firing on most bars, so most of each block is reused after a rebalance
+    ("1d", 1, None, 0.001),
+    (None, None, 0.002, 0.0),
+])
+def test_rebalancing_matches_loop(all_results, every, period_days, threshold, fee):
+    portfolio = RebalancedPortfolio(all_results, every=every, threshold=threshold, fee=fee)
+    units, events, fees = rebalance_loop(portfolio, period_days, threshold, fee)
+
+    assert len(events) > 1
+    np.testing.assert_array_equal(portfolio.rebalance_indices, events)
+    np.testing.assert_allclose(portfolio.units, units, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(portfolio.total_values, (units * portfolio.prices).sum(axis=0), rtol=1e-9)
+    assert portfolio.fees_paid == pytest.approx(fees)
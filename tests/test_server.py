@@ -0,0 +1,112 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+import pytest
+from src.exchange_backends import ReplayExchange
+from src.server import DCAService, LRUCache, make_server
+from synthetic import synthetic_ohlcv
+
+DAY_MS = 86_400_000
+
+
+@pytest.fixture
+def service():
+    # Daily candles up to and including the one that is still forming today
+    today_ts = int(datetime.now().timestamp() * 1000) // DAY_MS * DAY_MS
+    rows = synthetic_ohlcv(200, "1d").tolist()
+    for i, row in enumerate(rows):
+        row[0] = today_ts - (len(rows) - 1 - i) * DAY_MS
+    exchange = ReplayExchange(exchange_id="synthetic", candles={("BTC/USDT", "1d"): rows})
+    return DCAService(exchanges={"synthetic": exchange})
+
+
+def test_open_ended_request_excludes_forming_bar(service):
+    today_ts = int(datetime.now().timestamp() * 1000) // DAY_MS * DAY_MS
+    response = service.calculate(
+        {"BTC/USDT": 100}, start_date=datetime.now() - timedelta(days=60), exchange_id="synthetic",
+        include_series=True
+    )
+    timestamps = response["pairs"]["BTC/USDT"]["series"]["timestamps"]
+    assert timestamps[-1] == today_ts - DAY_MS
+
+
+def test_start_after_end_is_rejected(service):
+    with pytest.raises(ValueError, match="is after end"):
+        service.calculate(
+            {"BTC/USDT": 100}, start_date=datetime(2024, 1, 2), end_date=datetime(2024, 1, 1),
+            exchange_id="synthetic"
+        )
+
+
+@pytest.fixture
+def base_url(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, body=None):
+    try:
+        with urllib.request.urlopen(url, data=body, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b'"BTC/USDT"', b"3"])
+def test_post_body_must_be_an_object(base_url, body):
+    status, payload = request(f"{base_url}/dca", body)
+    assert status == 400
+    assert payload["error"] == "Request body must be a JSON object"
+
+
+@pytest.mark.parametrize("query", ["pairs=BTCUSDT", "pairs=BTC/USDT:abc", "pairs=BTC/USDT:60,ETH/USDT"])
+def test_malformed_pairs(base_url, query):
+    status, payload = request(f"{base_url}/dca?{query}")
+    assert status == 400
+    assert payload["error"].startswith("Invalid pair format. Use PAIR:PERCENTAGE")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 3, "misses": 1}
+
+
+def test_extending_a_range_fetches_only_the_tail(service):
+    start = datetime.now() - timedelta(days=150)
+    first_end = datetime.now() - timedelta(days=60)
+    service.calculate({"BTC/USDT": 100}, start_date=start, end_date=first_end, exchange_id="synthetic")
+    fetcher = service._fetchers["synthetic"]
+    loaded = service._prices[("synthetic", "BTC/USDT", "1d")][0]
+
+    calls = []
+    fetch = fetcher.fetch_historical_data
+
+    def recording_fetch(pair, start_date, end_date, **kwargs):
+        calls.append(int(start_date.timestamp() * 1000))
+        return fetch(pair, start_date, end_date, **kwargs)
+
+    fetcher.fetch_historical_data = recording_fetch
+    # Inside the loaded range: a slice, nothing fetched
+    service.calculate({"BTC/USDT": 100}, start_date=start + timedelta(days=10), end_date=first_end,
+                      exchange_id="synthetic")
+    assert calls == []
+
+    extended = service.calculate({"BTC/USDT": 100}, start_date=start, exchange_id="synthetic", include_series=True)
+    # From the last candle held, not from the start of the range
+    assert calls == [loaded["Start"].iloc[-1].value // 1_000_000]
+
+    fresh = DCAService(exchanges={"synthetic": fetcher.exchange})
+    expected = fresh.calculate({"BTC/USDT": 100}, start_date=start, exchange_id="synthetic", include_series=True)
+    assert extended["pairs"] == expected["pairs"]
@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+from src.calculator import DCACalculator, IncrementalDCACalculator
+from src.results import DCAResult
+from src.strategies import BuyTheDip, FixedInterval, MovingAverageGate, ValueAveraging
+from synthetic import synthetic_frame, synthetic_ohlcv
+
+
+def schedule(n, every, amount=10.0):
+    investments = np.zeros(n)
+    investments[every - 1::every] = amount
+    return investments
+
+
+def value_averaging_loop(prices, schedule, allow_sells):
+    investments = np.zeros_like(schedule)
+    target = units = 0.0
+    for i, amount in enumerate(schedule):
+        if not amount:
+            continue
+        target += amount
+        invest = target - units * prices[i]
+        if not allow_sells:
+            invest = max(invest, 0.0)
+        investments[i] = invest
+        units += invest / prices[i]
+    return investments
+
+
+def buy_the_dip_loop(prices, schedule, multiplier, threshold):
+    investments = np.zeros_like(schedule)
+    for i, amount in enumerate(schedule):
+        if not amount:
+            continue
+        invested = investments[:i].sum()
+        units = (investments[:i] / prices[:i]).sum()
+        if units > 0 and prices[i] < invested / units * (1 - threshold):
+            amount *= multiplier
+        investments[i] = amount
+    return investments
+
+
+def ma_gate_loop(prices, schedule, window, below, carry):
+    investments = np.zeros_like(schedule)
+    saved = 0.0
+    for i, amount in enumerate(schedule):
+        saved += amount
+        if not amount or i < window - 1:
+            continue
+        average = prices[i - window + 1:i + 1].mean()
+        if (prices[i] < average) if below else (prices[i] > average):
+            investments[i] = saved if carry else amount
+            saved = 0.0
+    return investments
+
+
+@pytest.fixture
+def prices():
+    return synthetic_ohlcv(600, "1d", seed=3)[:, 4]
+
+
+@pytest.mark.parametrize("every", [1, 7])
+def test_fixed_interval(prices, every):
+    investments = schedule(len(prices), every)
+    np.testing.assert_array_equal(FixedInterval()(prices, investments), investments)
+
+
+@pytest.mark.parametrize("allow_sells", [False, True])
+@pytest.mark.parametrize("every", [1, 7])
+def test_value_averaging(prices, allow_sells, every):
+    investments = schedule(len(prices), every)
+    np.testing.assert_allclose(
+        ValueAveraging(allow_sells)(prices, investments),
+        value_averaging_loop(prices, investments, allow_sells),
+        atol=1e-9,
+    )
+
+
+@pytest.mark.parametrize("multiplier, threshold", [(2.0, 0.0), (3.0, 0.1)])
+def test_buy_the_dip(prices, multiplier, threshold):
+    investments = schedule(len(prices), 7)
+    result = BuyTheDip(multiplier, threshold)(prices, investments)
+    np.testing.assert_allclose(result, buy_the_dip_loop(prices, investments, multiplier, threshold))
+    assert (result > investments).any()
+
+
+@pytest.mark.parametrize("below", [False, True])
+@pytest.mark.parametrize("carry", [False, True])
+def test_moving_average_gate(prices, below, carry):
+    investments = schedule(len(prices), 7)
+    np.testing.assert_allclose(
+        MovingAverageGate(50, below, carry)(prices, investments),
+        ma_gate_loop(prices, investments, 50, below, carry),
+    )
+
+
+def test_moving_average_gate_intraday_window():
+    prices = synthetic_ohlcv(24 * 30, "1h", seed=4)[:, 4]
+    investments = schedule(len(prices), 24)
+    np.testing.assert_allclose(
+        MovingAverageGate(5)(prices, investments, "1h"),
+        ma_gate_loop(prices, investments, 5 * 24, False, True),
+    )
+
+
+def test_calculator_matches_loop():
+    frame = synthetic_frame(500, "1d", seed=5)
+    r = DCACalculator(frame, 10.0, "1w").results
+    prices = frame["Close"].to_numpy()
+    invested = crypto = peak = 0.0
+    worst = 0.0
+    negative = days = 0
+    for i, price in enumerate(prices):
+        if (i + 1) % 7 == 0:
+            invested += 70.0
+            crypto += 70.0 / price
+        value = crypto * price
+        peak = max(peak, value)
+        if peak > 0:
+            worst = min(worst, (value - peak) / peak * 100)
+        if invested > 0:
+            days += 1
+            negative += value < invested
+    assert r.total_invested == pytest.approx(invested)
+    assert r.total_crypto == pytest.approx(crypto)
+    assert r.max_drawdown == pytest.approx(worst)
+    assert (r.negative_pnl_days, r.total_days) == (negative, days)
+
+
+@pytest.mark.parametrize("timeframe, buy_period", [("1d", "1w"), ("1h", "1d")])
+def test_incremental_matches_calculator(timeframe, buy_period):
+    frame = synthetic_frame(1000, timeframe, seed=6)
+    expected = DCACalculator(frame, 10.0, buy_period, timeframe).results
+
+    incremental = IncrementalDCACalculator(daily_investment=10.0, buy_period=buy_period, timeframe=timeframe)
+    bounds = [0, 1, 50, 51, 400, 999, 1000]
+    for lo, hi in zip(bounds, bounds[1:]):
+        if hi - lo == 1:
+            incremental.update(frame["Start"].iloc[lo], frame["Close"].iloc[lo])
+        else:
+            incremental.extend(frame.iloc[lo:hi])
+    r = incremental.results
+
+    np.testing.assert_array_equal(r.timestamps, expected.timestamps)
+    for name in DCAResult.SERIES:
+        np.testing.assert_allclose(r[name], expected[name], rtol=1e-12, atol=1e-9)
+    for name in DCAResult.METRICS:
+        assert r[name] == pytest.approx(expected[name], rel=1e-9, abs=1e-9), name
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.calculator import DCACalculator
+from src.price_store import PriceWindow
+from src.sweep import DCASweep, EveryStartBacktest
+from synthetic import synthetic_frame
+
+
+def as_window(frame):
+    timestamps = frame["Start"].to_numpy().astype("datetime64[ms]").view(np.int64)
+    return PriceWindow(timestamps, {"Close": frame["Close"].to_numpy()})
+
+
+@pytest.mark.parametrize("timeframe, buy_periods", [("1d", ["1d", "1w", "1m"]), ("1h", ["4h", "1d", "1w"])])
+def test_sweep_matches_calculator(timeframe, buy_periods):
+    frame = synthetic_frame(24 * 60, timeframe)
+    start = frame["Start"].iloc[100]
+    sweep = DCASweep(frame, buy_periods, start_dates=[start], daily_investments=[10.0], timeframe=timeframe)
+    windowed = DCASweep(as_window(frame), buy_periods, start_dates=[start], daily_investments=[10.0],
+                        timeframe=timeframe)
+    pd.testing.assert_frame_equal(sweep.results, windowed.results)
+
+    for period, row in zip(buy_periods, sweep.results.itertuples()):
+        r = DCACalculator(frame.iloc[100:], 10.0, period, timeframe).results
+        assert row.total_invested == pytest.approx(r.total_invested)
+        assert row.current_value == pytest.approx(r.current_value)
+        assert row.max_drawdown == pytest.approx(r.max_drawdown)
+
+
+def test_every_start_matches_calculator():
+    frame = synthetic_frame(24 * 40, "1h")
+    backtest = EveryStartBacktest(as_window(frame), 10.0, "1d", "1h", horizon=24 * 14).results
+    for start in (0, 5, 300):
+        r = DCACalculator(frame.iloc[start:start + 24 * 14], 10.0, "1d", "1h").results
+        row = backtest.iloc[start]
+        assert row["total_invested"] == pytest.approx(r.total_invested)
+        assert row["final_value"] == pytest.approx(r.current_value)
+    # Starts without a full horizon
+    assert np.isnan(backtest["total_invested"].iloc[-1])